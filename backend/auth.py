@@ -4,43 +4,167 @@ PS Consult – UNTH: Authentication & Authorization Module
 JWT-based authentication with role-based access control (RBAC).
 """
 
+import asyncio
+import hashlib
+import hmac
+import logging
+import threading
+import time
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Optional
 
+from cachetools import TTLCache
 from fastapi import Depends, HTTPException, status, Request
+import jwt
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+from jwt import ExpiredSignatureError, InvalidTokenError
+from sqlalchemy import bindparam, select
 from sqlalchemy.orm import Session
 
-from config import settings
-from database import get_db
-from models import User, UserRole, AuditLog, AuditAction
+from backend.config import settings
+from backend.database import get_db, SessionLocal
+from backend.models import User, UserRole, AuditLog, AuditAction
+
+logger = logging.getLogger(__name__)
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
+# HMAC signing key, encoded once instead of on every encode/decode.
+_JWT_KEY = settings.SECRET_KEY.encode()
+_DEFAULT_TOKEN_LIFETIME = settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60  # seconds
+
+# Verified JWT payloads keyed by a SHA-256 digest of the token (never the raw
+# token). Entries live at most _TOKEN_CACHE_TTL seconds and are never served
+# past the token's own `exp` claim.
+_TOKEN_CACHE_TTL = 30
+_token_cache = TTLCache(maxsize=10000, ttl=_TOKEN_CACHE_TTL)
+
+# Column snapshots of recently authenticated users, keyed by username, so a
+# repeat bearer skips the users lookup. Same lifetime as the token cache; the
+# password hash is never kept. Entries are dropped when an admin edits the user.
+_auth_user_cache = TTLCache(maxsize=10000, ttl=_TOKEN_CACHE_TTL)
+_AUTH_USER_FIELDS = tuple(
+    c.key for c in User.__table__.columns if c.key != "hashed_password"
+)
+
+# Recent successful password verifications, keyed by an HMAC of the plain
+# password + stored hash. Only positive results are cached so the cache can
+# never be used as an oracle for wrong guesses.
+# verify_password runs in worker threads, so access is guarded by a lock.
+_verify_cache = TTLCache(maxsize=2048, ttl=300)
+_verify_cache_lock = threading.Lock()
+
+
+def _is_bcrypt_hash(hashed_password: str) -> bool:
+    return hashed_password.startswith(("$2a$", "$2b$", "$2y$"))
+
+
+@lru_cache(maxsize=1)
+def _password_hasher():
+    """argon2id for new hashes; existing bcrypt hashes still verify and are
+    rehashed to argon2 on the next successful login.
+
+    Built on first use so argon2 is only imported by requests that actually
+    hash or verify a password, not by every cold start.
+    """
+    from argon2 import PasswordHasher
+
+    return PasswordHasher(time_cost=2, memory_cost=19456, parallelism=1)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    key = hmac.new(
+        settings.SECRET_KEY.encode(),
+        plain_password.encode() + hashed_password.encode(),
+        "sha256",
+    ).digest()
+    with _verify_cache_lock:
+        if key in _verify_cache:
+            return True
+    if _is_bcrypt_hash(hashed_password):
+        # Legacy hash from before the argon2 switch
+        import bcrypt
+
+        try:
+            verified = bcrypt.checkpw(plain_password.encode(), hashed_password.encode())
+        except ValueError:
+            verified = False
+    else:
+        from argon2.exceptions import InvalidHashError, VerificationError
+
+        try:
+            verified = _password_hasher().verify(hashed_password, plain_password)
+        except (VerificationError, InvalidHashError):
+            verified = False
+    if verified:
+        with _verify_cache_lock:
+            _verify_cache[key] = True
+    return verified
 
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return _password_hasher().hash(password)
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True if the stored hash uses a deprecated scheme or outdated parameters."""
+    if _is_bcrypt_hash(hashed_password):
+        return True
+    return _password_hasher().check_needs_rehash(hashed_password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
-    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES))
-    to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    lifetime = int(expires_delta.total_seconds()) if expires_delta else _DEFAULT_TOKEN_LIFETIME
+    to_encode["exp"] = int(time.time()) + lifetime
+    return jwt.encode(to_encode, _JWT_KEY, algorithm=settings.ALGORITHM)
+
+
+def _precheck_jwt(token: str, now: float) -> None:
+    """Reject malformed, wrong-algorithm or expired tokens without verifying
+    the signature. Only ever rejects; acceptance still requires jwt.decode."""
+    if token.count(".") != 2:
+        raise InvalidTokenError("Malformed token")
+    if jwt.get_unverified_header(token).get("alg") != settings.ALGORITHM:
+        raise InvalidTokenError("Unexpected signing algorithm")
+    exp = jwt.decode(token, options={"verify_signature": False}).get("exp")
+    if isinstance(exp, (int, float)) and exp <= now:
+        raise ExpiredSignatureError("Signature has expired.")
 
 
-def decode_token(token: str) -> dict:
+async def _decode_jwt(token: str) -> dict:
+    """Verify and decode a JWT, reusing a recent verification of the same token.
+
+    Cache hits return without leaving the event loop; misses run the
+    signature check in a worker thread. Raises InvalidTokenError for invalid tokens;
+    failures are never cached.
+    """
+    key = hashlib.sha256(token.encode()).hexdigest()[:32]
+    now = time.time()
+    payload = _token_cache.get(key)
+    if payload is not None:
+        exp = payload.get("exp")
+        if exp is None or exp > now:
+            return payload
+        _token_cache.pop(key, None)
+
+    _precheck_jwt(token, now)
+    payload = await asyncio.to_thread(
+        jwt.decode,
+        token,
+        _JWT_KEY,
+        algorithms=[settings.ALGORITHM],
+        options={"verify_aud": False},
+    )
+    _token_cache[key] = payload
+    return payload
+
+
+async def decode_token(token: str) -> dict:
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
-    except JWTError:
+        return await _decode_jwt(token)
+    except InvalidTokenError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
@@ -48,18 +172,57 @@ def decode_token(token: str) -> dict:
         )
 
 
+@lru_cache(maxsize=1)
+def _user_by_username_stmt():
+    return select(User).where(User.username == bindparam("username"))
+
+
+def invalidate_cached_user(username: str) -> None:
+    """Forget the cached snapshot so the next request re-reads the user row."""
+    _auth_user_cache.pop(username, None)
+
+
+def _get_user_cached(request: Request, db: Session, username: str) -> Optional[User]:
+    """Look up a user by username, memoized for the lifetime of the request.
+
+    Within _TOKEN_CACHE_TTL of a previous lookup the user is rebuilt from its
+    cached snapshot as a transient, read-only User without touching the
+    database; callers must only read from it (id, role, full_name, ...).
+    """
+    cache = getattr(request.state, "user_cache", None)
+    if cache is None:
+        cache = request.state.user_cache = {}
+    user = cache.get(username)
+    if user is None:
+        snapshot = _auth_user_cache.get(username)
+        if snapshot is not None:
+            user = User(**snapshot)
+        else:
+            user = db.execute(
+                _user_by_username_stmt(), {"username": username}
+            ).scalar_one_or_none()
+            if user is None:
+                return None
+            _auth_user_cache[username] = {
+                field: getattr(user, field) for field in _AUTH_USER_FIELDS
+            }
+        cache[username] = user
+    return user
+
+
 async def get_current_user(
+    request: Request,
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db),
 ) -> User:
-    payload = decode_token(token)
+    payload = await decode_token(token)
     username: str = payload.get("sub")
     if username is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
         )
-    user = db.query(User).filter(User.username == username).first()
+    user = _get_user_cached(request, db, username)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -84,30 +247,160 @@ async def get_current_user_optional(
         return None
     token = auth_header.split(" ", 1)[1]
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        payload = await _decode_jwt(token)
         username = payload.get("sub")
         if not username:
             return None
-        user = db.query(User).filter(User.username == username).first()
+        user = _get_user_cached(request, db, username)
         if user and user.is_active:
             return user
-    except JWTError:
+    except InvalidTokenError:
         pass
     return None
 
 
 def require_roles(*roles: UserRole):
     """Dependency factory: restrict endpoint to specific roles."""
+    allowed = frozenset(roles)
+    detail = f"Access denied. Required roles: {[r.value for r in roles]}"
+
     async def role_checker(current_user: User = Depends(get_current_user)):
-        if current_user.role not in roles:
+        if current_user.role not in allowed:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
-                detail=f"Access denied. Required roles: {[r.value for r in roles]}",
+                detail=detail,
             )
         return current_user
     return role_checker
 
 
+# ──────────────────────────────────────────────────────────────────
+# Audit logging
+# ──────────────────────────────────────────────────────────────────
+
+AUDIT_BATCH_SIZE = settings.AUDIT_BATCH_SIZE
+AUDIT_FLUSH_INTERVAL = settings.AUDIT_FLUSH_INTERVAL  # seconds
+
+# Set while the background writer is running (long-lived hosts only).
+_audit_queue: Optional[asyncio.Queue] = None
+_audit_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _insert_audit_rows(db: Session, rows: list[dict]) -> None:
+    """Insert a batch of audit rows in one executemany and commit."""
+    try:
+        db.execute(AuditLog.__table__.insert(), rows)
+        db.commit()
+    except Exception:
+        db.rollback()
+        # One bad row (e.g. its consult was rolled back) must not lose the batch
+        for row in rows:
+            try:
+                db.execute(AuditLog.__table__.insert(), row)
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                logger.warning(f"Dropping audit entry {row.get('action')}: {e}")
+
+
+def _write_audit_rows(rows: list[dict]) -> None:
+    """Insert a batch of audit rows on a dedicated session."""
+    db = SessionLocal()
+    try:
+        _insert_audit_rows(db, rows)
+    finally:
+        db.close()
+
+
+def _flush_request_audit_rows(db: Session) -> None:
+    """get_db close hook: write the entries buffered during this request."""
+    rows = db.info.pop("audit_rows", None)
+    if rows:
+        # Drop whatever the handler left uncommitted; close() would anyway
+        db.rollback()
+        _insert_audit_rows(db, rows)
+
+
+async def _audit_writer(queue: asyncio.Queue):
+    """Drain the audit queue, writing up to AUDIT_BATCH_SIZE rows per
+    AUDIT_FLUSH_INTERVAL in a single INSERT."""
+    loop = asyncio.get_running_loop()
+    batch: list[dict] = []
+    try:
+        while True:
+            batch.append(await queue.get())
+            deadline = loop.time() + AUDIT_FLUSH_INTERVAL
+            while len(batch) < AUDIT_BATCH_SIZE:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            rows, batch = batch, []
+            await asyncio.to_thread(_write_audit_rows, rows)
+    except asyncio.CancelledError:
+        while not queue.empty():
+            batch.append(queue.get_nowait())
+        if batch:
+            _write_audit_rows(batch)
+        raise
+
+
+def start_audit_writer() -> asyncio.Task:
+    """Start the background audit writer. Call from the app lifespan."""
+    global _audit_queue, _audit_loop
+    _audit_queue = asyncio.Queue(maxsize=10_000)
+    _audit_loop = asyncio.get_running_loop()
+    return asyncio.create_task(_audit_writer(_audit_queue))
+
+
+async def stop_audit_writer(task: asyncio.Task):
+    """Stop the writer, flushing any queued entries."""
+    global _audit_queue, _audit_loop
+    _audit_queue = None
+    _audit_loop = None
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+
+
+def _put_from_thread(queue: asyncio.Queue, row: dict):
+    """Runs on the event loop for entries logged from worker threads."""
+    try:
+        queue.put_nowait(row)
+    except asyncio.QueueFull:
+        logger.warning("Audit queue full — writing entry in a worker thread")
+        asyncio.get_running_loop().run_in_executor(None, _write_audit_rows, [row])
+
+
+def _queue_audit_row(row: dict) -> bool:
+    """Hand a row to the background writer. False if it must be written here."""
+    queue, loop = _audit_queue, _audit_loop
+    if queue is None:
+        return False
+    try:
+        on_loop = asyncio.get_running_loop() is loop
+    except RuntimeError:
+        on_loop = False
+    if not on_loop:
+        # Sync endpoints run in the threadpool; asyncio.Queue is loop-bound
+        try:
+            loop.call_soon_threadsafe(_put_from_thread, queue, row)
+            return True
+        except RuntimeError:  # loop already closed
+            return False
+    try:
+        queue.put_nowait(row)
+        return True
+    except asyncio.QueueFull:
+        logger.warning("Audit queue full — writing entry inline")
+        return False
+
+
 def log_audit(
     db: Session,
     action: AuditAction,
@@ -116,14 +409,32 @@ def log_audit(
     details: Optional[str] = None,
     ip_address: Optional[str] = None,
 ):
-    """Create an audit log entry."""
-    log = AuditLog(
-        user_id=user_id,
-        consult_id=consult_id,
-        action=action,
-        details=details,
-        ip_address=ip_address,
-    )
-    db.add(log)
+    """Record an audit log entry.
+
+    When the background writer is running the entry is queued and written
+    in a batch. On serverless, entries logged on a request session (get_db)
+    are buffered and inserted together once the handler returns; only
+    sessions outside a request (scripts) commit inline.
+    """
+    row = {
+        "user_id": user_id,
+        "consult_id": consult_id,
+        "action": action,
+        "details": details,
+        "ip_address": ip_address,
+        "timestamp": datetime.utcnow(),
+    }
+    if _queue_audit_row(row):
+        return
+
+    close_hooks = db.info.get("close_hooks")
+    if close_hooks is not None:
+        pending = db.info.get("audit_rows")
+        if pending is None:
+            pending = db.info["audit_rows"] = []
+            close_hooks.append(_flush_request_audit_rows)
+        pending.append(row)
+        return
+
+    db.add(AuditLog(**row))
     db.commit()
-    return log
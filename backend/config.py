@@ -3,6 +3,7 @@ PS Consult – UNTH: Application Configuration
 """
 
 import os
+from functools import cached_property
 from pydantic_settings import BaseSettings
 from pydantic import field_validator
 from dotenv import load_dotenv
@@ -23,6 +24,15 @@ class Settings(BaseSettings):
     ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "480"))
 
+    # Connection pool for long-lived hosts (serverless uses NullPool)
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "20"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT: int = int(os.getenv("DB_POOL_TIMEOUT", "30"))  # seconds to wait for a free connection
+
+    # Background audit writer: flush after this many rows or seconds
+    AUDIT_BATCH_SIZE: int = int(os.getenv("AUDIT_BATCH_SIZE", "500"))
+    AUDIT_FLUSH_INTERVAL: float = float(os.getenv("AUDIT_FLUSH_INTERVAL", "0.5"))
+
     CORS_ORIGINS: str = os.getenv(
         "CORS_ORIGINS", "http://localhost:3000,http://localhost:5173"
     )
@@ -44,7 +54,7 @@ class Settings(BaseSettings):
         "mailto:ps-consult@unth.edu.ng"
     )
 
-    @property
+    @cached_property
     def cors_origins_list(self) -> list[str]:
         return [o.strip() for o in self.CORS_ORIGINS.split(",") if o.strip()]
 
@@ -0,0 +1,46 @@
+"""
+Bring the database's indexes in line with the models.
+
+Base.metadata.create_all() only builds indexes together with a new table,
+so indexes added to existing tables are created here. Plain indexes that
+merely duplicate a table's primary key (left over from `index=True` on
+primary key columns) are dropped. Indexes restricted to another dialect
+(the PostgreSQL trigram indexes) are skipped. Safe to re-run.
+"""
+from sqlalchemy import inspect, text
+
+from backend.database import Base, engine
+import backend.models  # noqa: F401  (registers the tables on Base.metadata)
+
+
+def main():
+    print("Syncing indexes...")
+    with engine.begin() as conn:
+        inspector = inspect(conn)
+        quote = conn.dialect.identifier_preparer.quote
+        if conn.dialect.name == "postgresql":
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        for table in Base.metadata.sorted_tables:
+            declared = {index.name for index in table.indexes}
+            pk_columns = [c.name for c in table.primary_key.columns]
+            existing = inspector.get_indexes(table.name)
+
+            for ix in existing:
+                if (ix["name"] not in declared and not ix["unique"]
+                        and ix["column_names"] == pk_columns):
+                    print(f"  {table.name}: dropping {ix['name']} (duplicates the primary key)")
+                    conn.execute(text(f"DROP INDEX {quote(ix['name'])}"))
+
+            existing_names = {ix["name"] for ix in existing}
+            for index in table.indexes:
+                ddl_if = getattr(index, "_ddl_if", None)
+                if ddl_if is not None and ddl_if.dialect not in (None, conn.dialect.name):
+                    continue
+                if index.name not in existing_names:
+                    print(f"  {table.name}: creating {index.name}")
+                    index.create(conn)
+    print("Done")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,11 +3,14 @@ PS Consult – UNTH: Database Connection & Session Management
 Supports SQLite (local dev) and PostgreSQL (Supabase production)
 """
 
+import os
+
 from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import NullPool
-from config import settings
+from backend.config import settings
 
 # Handle Supabase connection string format (postgres:// → postgresql://)
 db_url = settings.DATABASE_URL
@@ -28,16 +31,37 @@ if is_sqlite:
         cursor.execute("PRAGMA foreign_keys=ON")
         cursor.close()
 else:
-    # NullPool is essential for serverless (Vercel) — no persistent connections
     # connect_args timeout prevents hanging on slow Supabase connections
-    engine = create_engine(
-        db_url,
-        poolclass=NullPool,
-        connect_args={
-            "connect_timeout": 10,
-            "options": "-c statement_timeout=25000",
-        },
-    )
+    connect_args = {
+        "connect_timeout": 10,
+        # UTC session so now()-stamped timestamp columns match datetime.utcnow()
+        "options": "-c statement_timeout=25000 -c timezone=UTC",
+    }
+    if os.getenv("VERCEL"):
+        # NullPool is essential for serverless — each invocation is a fresh
+        # process, so pooling is left to Supavisor (transaction mode, :6543)
+        engine = create_engine(
+            db_url,
+            poolclass=NullPool,
+            connect_args={**connect_args, "sslmode": "require"},
+        )
+    else:
+        # Long-lived hosts keep a pool; recycle before Supabase's idle close
+        # and ping on checkout so a connection dropped while idle isn't handed out
+        engine_options = {}
+        if make_url(db_url).get_driver_name() == "psycopg2":
+            # Batch executemany UPDATE/DELETE too (INSERTs already use multi-row VALUES)
+            engine_options["executemany_mode"] = "values_plus_batch"
+        engine = create_engine(
+            db_url,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_pre_ping=True,
+            pool_recycle=1800,
+            connect_args=connect_args,
+            **engine_options,
+        )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -45,9 +69,18 @@ Base = declarative_base()
 
 
 def get_db():
-    """Dependency: yields a database session per request."""
+    """Dependency: yields a database session per request.
+
+    Callables appended to ``db.info["close_hooks"]`` run with the session
+    after the handler returns, just before it is closed.
+    """
     db = SessionLocal()
+    db.info["close_hooks"] = []
     try:
         yield db
     finally:
-        db.close()
+        try:
+            for hook in db.info["close_hooks"]:
+                hook(db)
+        finally:
+            db.close()
@@ -83,22 +83,53 @@ def fix_table(cursor, table_name, new_create_sql):
     cols = [row[1] for row in cursor.fetchall()]
     col_list = ", ".join(cols)
 
+    # Secondary indexes are built after the bulk copy rather than maintained
+    # row by row: both the table's existing ones (dropped with the backup)
+    # and any CREATE INDEX statements bundled with new_create_sql.
+    cursor.execute(
+        "SELECT sql FROM sqlite_master WHERE type='index' AND tbl_name=? AND sql IS NOT NULL",
+        (table_name,),
+    )
+    index_sql = [row[0] for row in cursor.fetchall()]
+    statements = [stmt.strip() for stmt in new_create_sql.split(";") if stmt.strip()]
+    create_sql = [stmt for stmt in statements if not stmt.upper().startswith(("CREATE INDEX", "CREATE UNIQUE INDEX"))]
+    index_sql += [stmt for stmt in statements if stmt not in create_sql and stmt not in index_sql]
+
     sys.stdout.write(f"Fixing {table_name} ({len(cols)} columns)...\n")
     cursor.execute(f"ALTER TABLE {table_name} RENAME TO {backup}")
-    cursor.execute(new_create_sql)
+    for stmt in create_sql:
+        cursor.execute(stmt)
     cursor.execute(f"INSERT INTO {table_name} ({col_list}) SELECT {col_list} FROM {backup}")
     cursor.execute(f"DROP TABLE {backup}")
-    sys.stdout.write(f"  -> Done\n")
+    for stmt in index_sql:
+        cursor.execute(stmt)
+    sys.stdout.write(f"  -> Done ({len(index_sql)} indexes rebuilt)\n")
 
 def main():
-    conn = sqlite3.connect(DB_PATH)
+    # isolation_level=None: we issue BEGIN/COMMIT ourselves so every
+    # RENAME/CREATE/INSERT/DROP lands in a single transaction
+    conn = sqlite3.connect(DB_PATH, isolation_level=None)
     conn.execute("PRAGMA foreign_keys = OFF")
+    journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+    synchronous = conn.execute("PRAGMA synchronous").fetchone()[0]
+    conn.execute("PRAGMA journal_mode = MEMORY")
+    conn.execute("PRAGMA synchronous = OFF")
+    # ~200 MB page cache and in-memory temp b-trees for the bulk copies
+    conn.execute("PRAGMA cache_size = -200000")
+    conn.execute("PRAGMA temp_store = MEMORY")
     cursor = conn.cursor()
 
-    for table_name, create_sql in FIXES.items():
-        fix_table(cursor, table_name, create_sql)
-
-    conn.commit()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for table_name, create_sql in FIXES.items():
+            fix_table(cursor, table_name, create_sql)
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.execute(f"PRAGMA synchronous = {synchronous}")
+        conn.execute(f"PRAGMA journal_mode = {journal_mode}")
     conn.execute("PRAGMA foreign_keys = ON")
 
     # Verify
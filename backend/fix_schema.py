@@ -34,25 +34,38 @@ def fix_table(conn, table_name, old_col_def, new_col_def):
     c.execute(new_sql)
     c.execute(f"INSERT INTO {table_name} ({col_list}) SELECT {col_list} FROM {temp_table}")
     c.execute(f"DROP TABLE {temp_table}")
-    conn.commit()
     print(f"  Fixed {table_name} successfully")
     return True
 
 
 def main():
-    conn = sqlite3.connect(DB_PATH)
+    # isolation_level=None: we issue BEGIN/COMMIT ourselves so both table
+    # rebuilds land in a single transaction
+    conn = sqlite3.connect(DB_PATH, isolation_level=None)
     conn.execute("PRAGMA foreign_keys = OFF")
+    journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+    synchronous = conn.execute("PRAGMA synchronous").fetchone()[0]
+    conn.execute("PRAGMA journal_mode = MEMORY")
+    conn.execute("PRAGMA synchronous = OFF")
 
-    print("Fixing consult_requests.created_by -> nullable...")
-    fix_table(conn, "consult_requests",
-              "created_by INTEGER NOT NULL",
-              "created_by INTEGER")
-
-    print("Fixing photos.uploaded_by -> nullable...")
-    fix_table(conn, "photos",
-              "uploaded_by INTEGER NOT NULL",
-              "uploaded_by INTEGER")
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        print("Fixing consult_requests.created_by -> nullable...")
+        fix_table(conn, "consult_requests",
+                  "created_by INTEGER NOT NULL",
+                  "created_by INTEGER")
 
+        print("Fixing photos.uploaded_by -> nullable...")
+        fix_table(conn, "photos",
+                  "uploaded_by INTEGER NOT NULL",
+                  "uploaded_by INTEGER")
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.execute(f"PRAGMA synchronous = {synchronous}")
+        conn.execute(f"PRAGMA journal_mode = {journal_mode}")
     conn.execute("PRAGMA foreign_keys = ON")
     conn.close()
     print("\nDone! Schema fixed.")
@@ -6,21 +6,21 @@ Deployment: Vercel (serverless) + Supabase (PostgreSQL)
 """
 
 import os
-import base64
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import FastAPI, Depends, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import Response
-from sqlalchemy.orm import Session
-
-from config import settings
-from database import engine, Base, get_db
-from models import Photo
-from routers.auth_router import router as auth_router
-from routers.consults_router import router as consults_router
-from routers.reviews_router import router as reviews_router
-from routers.dashboard_router import router as dashboard_router
-from routers.schedule_router import router as schedule_router
-from routers.push_router import router as push_router
+from sqlalchemy.orm import Session, undefer
+
+from backend.config import settings
+from backend.database import engine, Base, get_db
+from backend.models import Photo
+from backend.auth import start_audit_writer, stop_audit_writer
+from backend.routers.auth_router import router as auth_router
+from backend.routers.consults_router import router as consults_router
+from backend.routers.reviews_router import router as reviews_router
+from backend.routers.dashboard_router import router as dashboard_router
+from backend.routers.schedule_router import router as schedule_router
+from backend.routers.push_router import router as push_router
 
 # Create database tables on startup
 # Uses lifespan to handle gracefully when DB is not yet configured
@@ -33,8 +33,13 @@ async def lifespan(app):
     Note: Table creation is skipped in production (Vercel serverless)
     to avoid cold-start latency. Tables should be created via
     migration scripts or the seed.py utility.
+
+    The background audit writer only runs on long-lived hosts; serverless
+    invocations may be frozen before it flushes, so audit entries are
+    written inline there instead.
     """
     import logging
+    audit_writer = None
     if os.getenv("VERCEL"):
         logging.info("Vercel detected — skipping create_all for fast cold start")
     else:
@@ -42,7 +47,10 @@ async def lifespan(app):
             Base.metadata.create_all(bind=engine)
         except Exception as e:
             logging.warning(f"Could not create tables (DB may not be configured yet): {e}")
+        audit_writer = start_audit_writer()
     yield
+    if audit_writer:
+        await stop_audit_writer(audit_writer)
 
 app = FastAPI(
     title=settings.APP_NAME,
@@ -81,26 +89,39 @@ async def health_check():
 
 
 @app.get("/api/photos/{photo_id}")
-async def serve_photo(photo_id: int, db: Session = Depends(get_db)):
+def serve_photo(photo_id: int, request: Request, db: Session = Depends(get_db)):
     """Serve a single photo as a binary image response.
 
     This avoids embedding large base64 strings in JSON responses,
     keeping list endpoints fast and under Vercel's response size limit.
+    Photos are immutable, so the ETag is derived from id + upload time and
+    revalidations are answered with a 304 before the image bytes are loaded.
     """
-    photo = db.query(Photo).filter(Photo.id == photo_id).first()
+    query = db.query(Photo)
+    if "if-none-match" not in request.headers:
+        # Nothing to revalidate, so the bytes are needed: fetch them in one query
+        query = query.options(undefer(Photo.data))
+    photo = query.filter(Photo.id == photo_id).first()
     if not photo:
         raise HTTPException(status_code=404, detail="Photo not found")
 
-    image_data = base64.b64decode(photo.data)
+    uploaded = int(photo.uploaded_at.timestamp()) if photo.uploaded_at else 0
+    etag = f'"{photo.id}-{uploaded}"'
+    headers = {
+        # Patient images: browsers may keep them, shared caches/CDNs must not
+        "Cache-Control": "private, max-age=86400",
+        "ETag": etag,
+    }
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
     return Response(
-        content=image_data,
+        content=photo.data,
         media_type=photo.content_type,
-        headers={
-            "Cache-Control": "public, max-age=86400",
-        },
+        headers=headers,
     )
 
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+    uvicorn.run("backend.main:app", host="0.0.0.0", port=8000, reload=True)
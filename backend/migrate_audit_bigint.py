@@ -0,0 +1,32 @@
+"""
+One-time migration: widen audit_logs.id to BIGINT on PostgreSQL.
+
+SQLite integer keys are already 64-bit, so there is nothing to do there.
+Safe to re-run — an already-widened column is left untouched.
+"""
+from sqlalchemy import BigInteger, inspect, text
+
+from backend.database import engine, is_sqlite
+
+
+def main():
+    print("Widening audit_logs.id to BIGINT...")
+    if is_sqlite:
+        print("  SQLite integer keys are already 64-bit, skipping")
+        return
+    with engine.begin() as conn:
+        columns = {c["name"]: c for c in inspect(conn).get_columns("audit_logs")}
+        if isinstance(columns["id"]["type"], BigInteger):
+            print("  audit_logs.id is already BIGINT, skipping")
+            return
+        conn.execute(text("ALTER TABLE audit_logs ALTER COLUMN id TYPE BIGINT"))
+        seq = conn.execute(
+            text("SELECT pg_get_serial_sequence('audit_logs', 'id')")
+        ).scalar()
+        if seq:
+            conn.execute(text(f"ALTER SEQUENCE {seq} AS BIGINT"))
+    print("  Done")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+"""
+One-time migration: create the consult_counters table.
+
+Consult IDs (PSC-YYYY-NNNNN) are drawn from a per-year counter row instead
+of scanning consult_requests. The row for the current year is seeded on the
+next consult from the highest ID already issued, so no backfill is needed.
+Safe to re-run.
+"""
+from sqlalchemy import inspect
+
+from backend.database import engine
+from backend.models import ConsultCounter
+
+
+def main():
+    print("Creating consult ID counters...")
+    if inspect(engine).has_table(ConsultCounter.__tablename__):
+        print("  consult_counters already exists, skipping")
+        return
+    ConsultCounter.__table__.create(engine)
+    print("  Done")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+One-time migration: convert photos.data from base64 TEXT to raw bytes.
+
+PostgreSQL: the column is retyped to BYTEA, decoding in place.
+SQLite: columns are untyped, so each base64 row is decoded and rewritten.
+Safe to re-run — already-converted data is left untouched.
+"""
+import base64
+
+from sqlalchemy import LargeBinary, inspect, text
+
+from backend.database import engine, is_sqlite
+
+
+def migrate_postgres(conn):
+    columns = {c["name"]: c for c in inspect(conn).get_columns("photos")}
+    if isinstance(columns["data"]["type"], LargeBinary):
+        print("  photos.data is already BYTEA, skipping")
+        return
+    print("  Converting photos.data TEXT -> BYTEA...")
+    conn.execute(text(
+        "ALTER TABLE photos ALTER COLUMN data TYPE BYTEA USING decode(data, 'base64')"
+    ))
+    print("  Done")
+
+
+def migrate_sqlite(conn):
+    rows = conn.execute(text(
+        "SELECT id, data FROM photos WHERE typeof(data) = 'text'"
+    )).all()
+    print(f"  Decoding {len(rows)} base64 photo rows...")
+    for photo_id, data in rows:
+        conn.execute(
+            text("UPDATE photos SET data = :data WHERE id = :id"),
+            {"data": base64.b64decode(data), "id": photo_id},
+        )
+    print("  Done")
+
+
+def main():
+    print("Migrating photo storage to raw bytes...")
+    with engine.begin() as conn:
+        if is_sqlite:
+            migrate_sqlite(conn)
+        else:
+            migrate_postgres(conn)
+
+
+if __name__ == "__main__":
+    main()
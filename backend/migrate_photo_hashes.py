@@ -0,0 +1,56 @@
+"""
+One-time migration: add photos.content_hash and fill it for stored photos.
+
+Uploads are matched on this SHA-256 so a retried or repeated upload to the
+same consult reuses the stored row. Run create_indexes afterwards for the
+(consult_id, content_hash) index. Safe to re-run.
+"""
+import hashlib
+
+from sqlalchemy import inspect, text
+
+from backend.database import engine, is_sqlite
+
+
+def add_column(conn):
+    columns = {c["name"] for c in inspect(conn).get_columns("photos")}
+    if "content_hash" in columns:
+        print("  photos.content_hash already exists, skipping")
+        return
+    print("  Adding photos.content_hash...")
+    conn.execute(text("ALTER TABLE photos ADD COLUMN content_hash VARCHAR(64)"))
+
+
+def backfill_postgres(conn):
+    result = conn.execute(text(
+        "UPDATE photos SET content_hash = encode(sha256(data), 'hex') "
+        "WHERE content_hash IS NULL"
+    ))
+    print(f"  Hashed {result.rowcount} photos")
+
+
+def backfill_sqlite(conn):
+    rows = conn.execute(text(
+        "SELECT id, data FROM photos WHERE content_hash IS NULL"
+    )).all()
+    for photo_id, data in rows:
+        conn.execute(
+            text("UPDATE photos SET content_hash = :hash WHERE id = :id"),
+            {"hash": hashlib.sha256(data).hexdigest(), "id": photo_id},
+        )
+    print(f"  Hashed {len(rows)} photos")
+
+
+def main():
+    print("Adding photo content hashes...")
+    with engine.begin() as conn:
+        add_column(conn)
+        if is_sqlite:
+            backfill_sqlite(conn)
+        else:
+            backfill_postgres(conn)
+    print("  Done")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,12 +12,12 @@ Tables:
 """
 
 import enum
-from datetime import datetime
 from sqlalchemy import (
-    Column, Integer, String, Text, DateTime, Boolean, Enum, ForeignKey, Float, Date
+    Column, Integer, String, Text, DateTime, Boolean, Enum, ForeignKey, Float, Date,
+    BigInteger, DDL, Index, LargeBinary, event, func
 )
-from sqlalchemy.orm import relationship
-from database import Base
+from sqlalchemy.orm import deferred, relationship
+from backend.database import Base
 
 
 # ──────────────────────────────────────────────────────────────────
@@ -97,7 +97,7 @@ class SyncStatus(str, enum.Enum):
 class User(Base):
     __tablename__ = "users"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     username = Column(String(100), unique=True, index=True, nullable=False)
     email = Column(String(255), unique=True, index=True, nullable=True)
     hashed_password = Column(String(255), nullable=False)
@@ -106,19 +106,21 @@ class User(Base):
     unit = Column(String(255), nullable=True)
     phone_number = Column(String(20), nullable=True)
     is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # SQL defaults: the database stamps now() inside the INSERT/UPDATE itself
+    created_at = Column(DateTime, default=func.now())
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
 
     # Relationships
-    consults_created = relationship("ConsultRequest", back_populates="creator", foreign_keys="ConsultRequest.created_by")
-    reviews = relationship("ConsultReview", back_populates="reviewer")
-    audit_logs = relationship("AuditLog", back_populates="user")
+    # Never loaded implicitly: endpoints that need them must eager-load them
+    consults_created = relationship("ConsultRequest", back_populates="creator", foreign_keys="ConsultRequest.created_by", lazy="raise")
+    reviews = relationship("ConsultReview", back_populates="reviewer", lazy="raise")
+    audit_logs = relationship("AuditLog", back_populates="user", lazy="raise")
 
 
 class ConsultRequest(Base):
     __tablename__ = "consult_requests"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     consult_id = Column(String(50), unique=True, index=True, nullable=False)  # PSC-2026-00001
 
     # Patient Information
@@ -155,14 +157,39 @@ class ConsultRequest(Base):
 
     # Timestamps
     created_by = Column(Integer, ForeignKey("users.id"), nullable=True)  # null for public/open-access consults
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, default=func.now(), nullable=False)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
     reviewed_at = Column(DateTime, nullable=True)
     completed_at = Column(DateTime, nullable=True)
 
     # Offline tracking
     client_id = Column(String(100), nullable=True)  # For offline conflict resolution
 
+    __table_args__ = (
+        # list_consults / dashboard filters, newest first
+        Index("ix_consult_status_created", "status", "created_at"),
+        Index("ix_consult_created_by_created", "created_by", "created_at"),
+        Index("ix_consult_urgency_status", "urgency", "status"),
+        # response-time analytics: created_at range, accepted_at read from the index
+        Index("ix_consult_created_accepted", "created_at", "accepted_at"),
+        Index("ix_consult_urgency_created", "urgency", "created_at"),
+        # list_consults keyset order: (created_at, id) DESC
+        Index("ix_consult_created_id", "created_at", "id"),
+        # offline-sync dedup: one consult per client_id
+        Index(
+            "ix_consult_client_id", "client_id", unique=True,
+            postgresql_where=(client_id != None), sqlite_where=(client_id != None),
+        ),
+        # list_consults ILIKE '%term%' search (PostgreSQL pg_trgm only)
+        *(
+            Index(
+                f"ix_consult_{column}_trgm", column,
+                postgresql_using="gin", postgresql_ops={column: "gin_trgm_ops"},
+            ).ddl_if(dialect="postgresql")
+            for column in ("ward", "patient_name", "hospital_number", "consult_id")
+        ),
+    )
+
     # Relationships
     creator = relationship("User", back_populates="consults_created", foreign_keys=[created_by])
     acknowledger = relationship("User", foreign_keys=[acknowledged_by])
@@ -172,10 +199,25 @@ class ConsultRequest(Base):
     audit_logs = relationship("AuditLog", back_populates="consult")
 
 
+# The trigram indexes above need the pg_trgm extension in place first
+event.listen(
+    ConsultRequest.__table__, "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+
+
+class ConsultCounter(Base):
+    """Last issued PSC-YYYY-NNNNN sequence number, one row per year."""
+    __tablename__ = "consult_counters"
+
+    year = Column(Integer, primary_key=True, autoincrement=False)
+    last_seq = Column(Integer, nullable=False)
+
+
 class ConsultReview(Base):
     __tablename__ = "consult_reviews"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     consult_id = Column(Integer, ForeignKey("consult_requests.id"), nullable=False)
     reviewed_by = Column(Integer, ForeignKey("users.id"), nullable=False)
 
@@ -199,8 +241,8 @@ class ConsultReview(Base):
     follow_up_notes = Column(Text, nullable=True)
 
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, default=func.now())
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
 
     # Relationships
     consult = relationship("ConsultRequest", back_populates="reviews")
@@ -209,15 +251,22 @@ class ConsultReview(Base):
 
 class Photo(Base):
     __tablename__ = "photos"
+    __table_args__ = (
+        # Serves the per-consult photo list and the duplicate lookup on upload
+        Index("ix_photo_consult_hash", "consult_id", "content_hash"),
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     consult_id = Column(Integer, ForeignKey("consult_requests.id"), nullable=False)
     filename = Column(String(255), nullable=False)
     content_type = Column(String(100), nullable=False, default="image/jpeg")
-    data = Column(Text, nullable=False)  # base64-encoded image data
+    # raw image bytes (BYTEA); only loaded when .data is accessed
+    data = deferred(Column(LargeBinary, nullable=False))
+    # SHA-256 hex of data; repeat uploads to the same consult reuse the row
+    content_hash = Column(String(64), nullable=True)
     description = Column(Text, nullable=True)
     uploaded_by = Column(Integer, ForeignKey("users.id"), nullable=True)
-    uploaded_at = Column(DateTime, default=datetime.utcnow)
+    uploaded_at = Column(DateTime, default=func.now())
 
     # Relationships
     consult = relationship("ConsultRequest", back_populates="photos")
@@ -226,14 +275,22 @@ class Photo(Base):
 
 class AuditLog(Base):
     __tablename__ = "audit_logs"
-
-    id = Column(Integer, primary_key=True, index=True)
+    __table_args__ = (
+        # Audit trail views: per consult / per user, newest first
+        Index("ix_audit_consult_ts", "consult_id", "timestamp"),
+        Index("ix_audit_user_ts", "user_id", "timestamp"),
+        Index("ix_audit_ts", "timestamp"),
+    )
+
+    # BIGINT: the audit stream is append-only and outlives a 32-bit id.
+    # SQLite keeps INTEGER, its only auto-incrementing rowid alias (64-bit anyway).
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     consult_id = Column(Integer, ForeignKey("consult_requests.id"), nullable=True)
     action = Column(Enum(AuditAction), nullable=False)
     details = Column(Text, nullable=True)
     ip_address = Column(String(45), nullable=True)
-    timestamp = Column(DateTime, default=datetime.utcnow, nullable=False)
+    timestamp = Column(DateTime, default=func.now(), nullable=False)
 
     # Relationships
     user = relationship("User", back_populates="audit_logs")
@@ -243,7 +300,7 @@ class AuditLog(Base):
 class UnitSchedule(Base):
     __tablename__ = "unit_schedules"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     service_type = Column(Enum(ServiceType), nullable=False)
     day_of_week = Column(String(20), nullable=False)  # Monday, Tuesday, etc.
     start_time = Column(String(10), nullable=False, default="08:00")
@@ -251,20 +308,30 @@ class UnitSchedule(Base):
     location = Column(String(255), nullable=True)
     notes = Column(Text, nullable=True)
     is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, default=func.now())
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
 
 
 class Notification(Base):
     __tablename__ = "notifications"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     consult_id = Column(Integer, ForeignKey("consult_requests.id"), nullable=True)
     title = Column(String(255), nullable=False)
     message = Column(Text, nullable=False)
     is_read = Column(Boolean, default=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=func.now())
+
+    __table_args__ = (
+        # get_notifications: a user's newest first
+        Index("ix_notification_user_created", "user_id", "created_at"),
+        # unread badge / mark_all_read: only the unread slice is indexed
+        Index(
+            "ix_notification_user_unread", "user_id",
+            postgresql_where=(is_read == False), sqlite_where=(is_read == False),
+        ),
+    )
 
     # Relationships
     user = relationship("User")
@@ -275,12 +342,12 @@ class PushSubscription(Base):
     """Stores Web Push API subscriptions for push notifications."""
     __tablename__ = "push_subscriptions"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     endpoint = Column(Text, nullable=False, unique=True)
     p256dh = Column(String(255), nullable=False)
     auth = Column(String(255), nullable=False)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=func.now())
 
     # Relationships
     user = relationship("User")
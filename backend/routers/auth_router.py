@@ -2,30 +2,47 @@
 PS Consult – UNTH: Authentication Router
 """
 
+import hmac
+import threading
 from datetime import timedelta
-from fastapi import APIRouter, Depends, HTTPException, status, Request
-from sqlalchemy.orm import Session
-
-from pydantic import BaseModel as PydanticBaseModel
-
-from database import get_db
-from models import User, UserRole, AuditAction
-from schemas import LoginRequest, Token, UserCreate, UserOut, UserUpdate
-from auth import (
-    verify_password, get_password_hash, create_access_token,
-    get_current_user, require_roles, log_audit
+from cachetools import TTLCache
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Request
+from sqlalchemy import update
+from sqlalchemy.orm import Session, raiseload
+
+from pydantic import BaseModel as PydanticBaseModel, TypeAdapter
+
+from backend.database import get_db
+from backend.models import User, UserRole, AuditAction
+from backend.schemas import LoginRequest, Token, UserCreate, UserOut, UserUpdate, UserListResponse
+from backend.auth import (
+    verify_password, get_password_hash, password_needs_rehash, create_access_token,
+    get_current_user, require_roles, log_audit, invalidate_cached_user
 )
-from config import settings
+from backend.config import settings
 
 # Doctor access code – change in production via DOCTOR_CODE env var
 import os
 DOCTOR_CODE = os.getenv("DOCTOR_CODE", "BLACKVELVET")
+_DOCTOR_CODE_UPPER = DOCTOR_CODE.upper().encode()
 
 router = APIRouter(prefix="/api/auth", tags=["Authentication"])
 
+# Id of the account code logins act as; re-resolved at most once a minute.
+# code_login runs in worker threads, so access is guarded by a lock.
+_code_login_user_id = TTLCache(maxsize=1, ttl=60)
+_code_login_lock = threading.Lock()
+
+# Validators built once at import; the list adapter validates a whole page
+# in one call instead of one model_validate per row
+_user_adapter = TypeAdapter(UserOut)
+_users_adapter = TypeAdapter(list[UserOut])
+
 
 @router.post("/login", response_model=Token)
-async def login(request: Request, login_data: LoginRequest, db: Session = Depends(get_db)):
+def login(request: Request, login_data: LoginRequest, db: Session = Depends(get_db)):
+    # Plain def: FastAPI runs this in its threadpool, so the user lookup and
+    # the (CPU-bound, GIL-releasing) hash check both stay off the event loop
     user = db.query(User).filter(User.username == login_data.username).first()
     if not user or not verify_password(login_data.password, user.hashed_password):
         raise HTTPException(
@@ -38,6 +55,11 @@ async def login(request: Request, login_data: LoginRequest, db: Session = Depend
             detail="Account is deactivated",
         )
 
+    # Transparently migrate legacy bcrypt hashes to argon2
+    if password_needs_rehash(user.hashed_password):
+        user.hashed_password = get_password_hash(login_data.password)
+        db.commit()
+
     access_token = create_access_token(
         data={"sub": user.username, "role": user.role.value},
         expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
@@ -52,7 +74,7 @@ async def login(request: Request, login_data: LoginRequest, db: Session = Depend
     return Token(
         access_token=access_token,
         token_type="bearer",
-        user=UserOut.model_validate(user),
+        user=_user_adapter.validate_python(user, from_attributes=True),
     )
 
 
@@ -61,24 +83,38 @@ class CodeLoginRequest(PydanticBaseModel):
 
 
 @router.post("/code-login", response_model=Token)
-async def code_login(request: Request, body: CodeLoginRequest, db: Session = Depends(get_db)):
+def code_login(request: Request, body: CodeLoginRequest, db: Session = Depends(get_db)):
     """Login using the doctor access code. Returns admin-level token."""
-    if body.code.strip().upper() != DOCTOR_CODE.upper():
+    # Constant-time compare so response timing doesn't leak the code
+    if not hmac.compare_digest(body.code.strip().upper().encode(), _DOCTOR_CODE_UPPER):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid access code",
         )
 
     # Find the admin user (or first consultant)
-    admin_user = db.query(User).filter(
-        User.role == UserRole.ADMIN, User.is_active == True
-    ).first()
+    admin_user = None
+    with _code_login_lock:
+        cached_id = _code_login_user_id.get("id")
+    if cached_id is not None:
+        admin_user = db.get(User, cached_id)
+        if not (
+            admin_user and admin_user.is_active
+            and admin_user.role in (UserRole.ADMIN, UserRole.CONSULTANT)
+        ):
+            admin_user = None
+    if not admin_user:
+        admin_user = db.query(User).filter(
+            User.role == UserRole.ADMIN, User.is_active == True
+        ).first()
     if not admin_user:
         admin_user = db.query(User).filter(
             User.role == UserRole.CONSULTANT, User.is_active == True
         ).first()
     if not admin_user:
         raise HTTPException(status_code=500, detail="No admin user found in system")
+    with _code_login_lock:
+        _code_login_user_id["id"] = admin_user.id
 
     access_token = create_access_token(
         data={"sub": admin_user.username, "role": admin_user.role.value},
@@ -94,26 +130,26 @@ async def code_login(request: Request, body: CodeLoginRequest, db: Session = Dep
     return Token(
         access_token=access_token,
         token_type="bearer",
-        user=UserOut.model_validate(admin_user),
+        user=_user_adapter.validate_python(admin_user, from_attributes=True),
     )
 
 
 @router.get("/me", response_model=UserOut)
 async def get_me(current_user: User = Depends(get_current_user)):
-    return UserOut.model_validate(current_user)
+    return _user_adapter.validate_python(current_user, from_attributes=True)
 
 
 @router.post("/register", response_model=UserOut)
-async def register_user(
+def register_user(
     user_data: UserCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_roles(UserRole.ADMIN)),
 ):
     """Only admins can register new users."""
-    existing = db.query(User).filter(
-        (User.username == user_data.username) | (User.email == user_data.email)
-    ).first()
-    if existing:
+    duplicate = User.username == user_data.username
+    if user_data.email:
+        duplicate = duplicate | (User.email == user_data.email)
+    if db.query(db.query(User).filter(duplicate).exists()).scalar():
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username or email already registered",
@@ -137,37 +173,59 @@ async def register_user(
         details=f"Created user {new_user.username} with role {new_user.role.value}",
     )
 
-    return UserOut.model_validate(new_user)
+    return _user_adapter.validate_python(new_user, from_attributes=True)
 
 
-@router.get("/users", response_model=list[UserOut])
-async def list_users(
+@router.get("/users", response_model=UserListResponse)
+def list_users(
+    limit: int = Query(100, ge=1, le=500),
+    after_id: int = Query(0, ge=0),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_roles(UserRole.ADMIN)),
 ):
-    users = db.query(User).all()
-    return [UserOut.model_validate(u) for u in users]
+    """List users in id order. Keyset-paginated: pass the previous page's
+    next_after_id as after_id to continue."""
+    users = (
+        db.query(User)
+        .options(raiseload("*"))
+        .filter(User.id > after_id)
+        .order_by(User.id)
+        .limit(limit)
+        .all()
+    )
+    return UserListResponse(
+        users=_users_adapter.validate_python(users, from_attributes=True),
+        next_after_id=users[-1].id if len(users) == limit else None,
+    )
 
 
 @router.put("/users/{user_id}", response_model=UserOut)
-async def update_user(
+def update_user(
     user_id: int,
     user_data: UserUpdate,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_roles(UserRole.ADMIN)),
 ):
-    user = db.query(User).filter(User.id == user_id).first()
+    values = user_data.model_dump(exclude_unset=True)
+    if values:
+        # One UPDATE ... RETURNING instead of SELECT, UPDATE and refresh
+        user = db.execute(
+            update(User).where(User.id == user_id).values(**values).returning(User)
+        ).scalar_one_or_none()
+    else:
+        user = db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-
-    for field, value in user_data.model_dump(exclude_unset=True).items():
-        setattr(user, field, value)
+    # Serialise before commit() expires the returned row
+    user_out = _user_adapter.validate_python(user, from_attributes=True)
     db.commit()
-    db.refresh(user)
+    invalidate_cached_user(user_out.username)
+    with _code_login_lock:
+        _code_login_user_id.clear()
 
     log_audit(
         db, AuditAction.MODIFIED, user_id=current_user.id,
-        details=f"Updated user {user.username}",
+        details=f"Updated user {user_out.username}",
     )
 
-    return UserOut.model_validate(user)
+    return user_out
@@ -10,35 +10,71 @@ Handles CRUD operations for consult requests with:
 """
 
 import base64
-from datetime import datetime, date
+from datetime import datetime, date, time, timedelta
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Request, Query, UploadFile, File, Form
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func
-
-from database import get_db
-from models import (
-    ConsultRequest, User, UserRole, ConsultStatus, UrgencyLevel,
-    AuditAction, Notification, SyncStatus, Photo
+from fastapi import (
+    APIRouter, BackgroundTasks, Depends, HTTPException, status, Request, Query,
+    UploadFile, File, Form,
 )
-from config import settings
-from schemas import (
+from sqlalchemy.orm import Session, joinedload, raiseload
+from sqlalchemy import func, insert, select, text, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from backend.database import get_db, is_sqlite
+from backend.models import (
+    ConsultRequest, ConsultCounter, User, UserRole, ConsultStatus, UrgencyLevel,
+    AuditAction, Notification, SyncStatus
+)
+from backend.config import settings
+from backend.schemas import (
     ConsultRequestCreate, ConsultRequestOut, ConsultStatusUpdate,
-    ConsultListResponse, ConsultAcknowledgement
+    ConsultListResponse, ConsultAcknowledgement, PhotoOut, UserOut
 )
-from auth import get_current_user, require_roles, log_audit
-from routers.push_router import send_push_to_team
+from backend.auth import get_current_user, require_roles, log_audit
+from backend.routers.push_router import send_push_to_team_background
+from backend.routers.reviews_router import photo_out, read_photo_upload, save_photo
 
 router = APIRouter(prefix="/api/consults", tags=["Consult Requests"])
 
+# Everything ConsultRequestOut reads, loaded up front; any other relationship
+# access on these queries raises instead of silently issuing a lazy SELECT.
+CONSULT_LOAD_OPTS = (joinedload(ConsultRequest.creator), raiseload("*"))
+
+# Roles notified in-app about every new consult
+PS_TEAM_ROLES = (UserRole.REGISTRAR, UserRole.SENIOR_REGISTRAR, UserRole.CONSULTANT)
+
 
 def generate_consult_id(db: Session) -> str:
     """Generate unique consult ID: PSC-YYYY-NNNNN"""
+    return generate_consult_ids(db, 1)[0]
+
+
+def generate_consult_ids(db: Session, count: int) -> list[str]:
+    """Reserve ``count`` consecutive consult IDs.
+
+    The year's counter row is bumped atomically, so concurrent requests never
+    draw the same number (the row stays locked until the consults commit).
+    """
     year = datetime.utcnow().year
+    last_seq = db.execute(
+        update(ConsultCounter)
+        .where(ConsultCounter.year == year)
+        .values(last_seq=ConsultCounter.last_seq + count)
+        .returning(ConsultCounter.last_seq)
+    ).scalar()
+    if last_seq is None:
+        last_seq = _start_consult_counter(db, year, count)
+    return [f"PSC-{year}-{seq:05d}" for seq in range(last_seq - count + 1, last_seq + 1)]
+
+
+def _start_consult_counter(db: Session, year: int, count: int) -> int:
+    """Create the year's counter, continuing from any consults already issued.
+    Returns the last sequence number reserved."""
     year_start = datetime(year, 1, 1)
     year_end = datetime(year + 1, 1, 1)
     last = (
-        db.query(ConsultRequest)
+        db.query(ConsultRequest.consult_id)
         .filter(ConsultRequest.created_at >= year_start)
         .filter(ConsultRequest.created_at < year_end)
         .order_by(ConsultRequest.id.desc())
@@ -50,7 +86,15 @@ def generate_consult_id(db: Session) -> str:
             seq = int(last.consult_id.split("-")[-1]) + 1
         except (ValueError, IndexError):
             seq = 1
-    return f"PSC-{year}-{seq:05d}"
+
+    # Another request may have created the row meanwhile; then just bump it
+    upsert = sqlite_insert if is_sqlite else pg_insert
+    stmt = upsert(ConsultCounter).values(year=year, last_seq=seq + count - 1)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ConsultCounter.year],
+        set_={"last_seq": ConsultCounter.last_seq + count},
+    ).returning(ConsultCounter.last_seq)
+    return db.execute(stmt).scalar()
 
 
 def create_notification(db: Session, user_id: int, consult_id: int, title: str, message: str):
@@ -64,39 +108,45 @@ def create_notification(db: Session, user_id: int, consult_id: int, title: str,
     db.add(notif)
 
 
-def notify_plastic_surgery_team(db: Session, consult: ConsultRequest):
-    """Notify all plastic surgery team members about a new consult."""
-    ps_users = db.query(User).filter(
-        User.role.in_([UserRole.REGISTRAR, UserRole.SENIOR_REGISTRAR, UserRole.CONSULTANT]),
+def notify_plastic_surgery_team(db: Session, *consults: ConsultRequest):
+    """Notify all plastic surgery team members about new consults."""
+    ps_user_ids = db.query(User.id).filter(
+        User.role.in_(PS_TEAM_ROLES),
         User.is_active == True,
     ).all()
 
-    for user in ps_users:
-        create_notification(
-            db, user.id, consult.id,
-            title=f"New Consult – {consult.urgency.value.upper()}",
-            message=(
-                f"New consult from {consult.inviting_unit}: "
-                f"{consult.patient_name} ({consult.ward}). "
-                f"Urgency: {consult.urgency.value}. "
-                f"Contact: {consult.phone_number}"
-            ),
+    rows = []
+    for consult in consults:
+        title = f"New Consult – {consult.urgency.value.upper()}"
+        message = (
+            f"New consult from {consult.inviting_unit}: "
+            f"{consult.patient_name} ({consult.ward}). "
+            f"Urgency: {consult.urgency.value}. "
+            f"Contact: {consult.phone_number}"
+        )
+        rows.extend(
+            {"user_id": user_id, "consult_id": consult.id, "title": title, "message": message}
+            for (user_id,) in ps_user_ids
         )
-    consult.notification_sent = True
+        consult.notification_sent = True
+    # One multi-row INSERT for the whole team rather than one per member
+    if rows:
+        db.execute(insert(Notification), rows)
 
 
-@router.post("/", response_model=ConsultAcknowledgement, status_code=status.HTTP_201_CREATED)
-async def create_consult(
+def _create_consult(
+    db: Session,
     request: Request,
     consult_data: ConsultRequestCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-):
-    """Create a new consult request with immediate acknowledgement."""
+    background_tasks: BackgroundTasks,
+    creator: Optional[User],
+) -> ConsultAcknowledgement:
+    """Shared body of the authenticated and open-access create endpoints."""
     # Check for duplicate offline submission
     if consult_data.client_id:
-        existing = db.query(ConsultRequest).filter(
-            ConsultRequest.client_id == consult_data.client_id
+        existing = db.execute(
+            select(ConsultRequest.consult_id, ConsultRequest.created_at)
+            .where(ConsultRequest.client_id == consult_data.client_id)
         ).first()
         if existing:
             return ConsultAcknowledgement(
@@ -110,26 +160,10 @@ async def create_consult(
 
     consult = ConsultRequest(
         consult_id=consult_id,
-        patient_name=consult_data.patient_name,
-        hospital_number=consult_data.hospital_number,
-        age=consult_data.age,
-        sex=consult_data.sex,
-        ward=consult_data.ward,
-        bed_number=consult_data.bed_number,
-        date_of_admission=consult_data.date_of_admission,
-        primary_diagnosis=consult_data.primary_diagnosis,
-        indication=consult_data.indication,
-        indication_category=consult_data.indication_category,
-        urgency=consult_data.urgency,
-        inviting_unit=consult_data.inviting_unit,
-        consultant_in_charge=consult_data.consultant_in_charge,
-        requesting_doctor=consult_data.requesting_doctor,
-        designation=consult_data.designation,
-        phone_number=consult_data.phone_number,
-        alternate_phone=consult_data.alternate_phone,
+        **consult_data.model_dump(exclude={"client_id"}),
         status=ConsultStatus.PENDING,
         sync_status=SyncStatus.SYNCED,
-        created_by=current_user.id,
+        created_by=creator.id if creator else None,
         client_id=consult_data.client_id,
     )
     db.add(consult)
@@ -138,29 +172,33 @@ async def create_consult(
     # Notify plastic surgery team
     notify_plastic_surgery_team(db, consult)
 
-    # Audit log
+    # Audit log (no user for open-access submissions)
+    if creator:
+        details = f"Consult {consult_id} created for patient {consult.patient_name}"
+    else:
+        details = (
+            f"Public consult {consult_id} created for patient {consult.patient_name} "
+            f"by {consult_data.requesting_doctor}"
+        )
     log_audit(
-        db, AuditAction.CREATED, user_id=current_user.id,
+        db, AuditAction.CREATED, user_id=creator.id if creator else None,
         consult_id=consult.id,
-        details=f"Consult {consult_id} created for patient {consult.patient_name}",
+        details=details,
         ip_address=request.client.host if request.client else None,
     )
 
     db.commit()
     db.refresh(consult)
 
-    # Send push notification to the plastic surgery team
-    try:
-        urgency_label = consult.urgency.value.upper()
-        send_push_to_team(
-            db,
-            title=f"\U0001f6a8 New Consult \u2013 {urgency_label}",
-            body=f"{consult.patient_name} ({consult.ward}) \u2013 {consult.primary_diagnosis}. From: {consult.inviting_unit}",
-            url=f"/app/consults/{consult.id}",
-            tag=f"consult-{consult.consult_id}",
-        )
-    except Exception:
-        pass  # Push is best-effort, never block consult creation
+    # Push to the plastic surgery team after the response has gone out
+    urgency_label = consult.urgency.value.upper()
+    background_tasks.add_task(
+        send_push_to_team_background,
+        title=f"\U0001f6a8 New Consult \u2013 {urgency_label}",
+        body=f"{consult.patient_name} ({consult.ward}) \u2013 {consult.primary_diagnosis}. From: {consult.inviting_unit}",
+        url=f"/app/consults/{consult.id}",
+        tag=f"consult-{consult.consult_id}",
+    )
 
     return ConsultAcknowledgement(
         status="success",
@@ -170,94 +208,85 @@ async def create_consult(
     )
 
 
+@router.post("/", response_model=ConsultAcknowledgement, status_code=status.HTTP_201_CREATED)
+def create_consult(
+    request: Request,
+    consult_data: ConsultRequestCreate,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Create a new consult request with immediate acknowledgement."""
+    return _create_consult(db, request, consult_data, background_tasks, creator=current_user)
+
+
 @router.post("/public", response_model=ConsultAcknowledgement, status_code=status.HTTP_201_CREATED)
-async def create_consult_public(
+def create_consult_public(
     request: Request,
     consult_data: ConsultRequestCreate,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
 ):
     """Create a consult request WITHOUT authentication (open access)."""
-    # Check for duplicate offline submission
-    if consult_data.client_id:
-        existing = db.query(ConsultRequest).filter(
-            ConsultRequest.client_id == consult_data.client_id
-        ).first()
-        if existing:
-            return ConsultAcknowledgement(
-                status="success",
-                consult_id=existing.consult_id,
-                received_at=existing.created_at,
-                message="Consult request already received (duplicate detected).",
-            )
+    return _create_consult(db, request, consult_data, background_tasks, creator=None)
 
-    consult_id = generate_consult_id(db)
 
-    consult = ConsultRequest(
-        consult_id=consult_id,
-        patient_name=consult_data.patient_name,
-        hospital_number=consult_data.hospital_number,
-        age=consult_data.age,
-        sex=consult_data.sex,
-        ward=consult_data.ward,
-        bed_number=consult_data.bed_number,
-        date_of_admission=consult_data.date_of_admission,
-        primary_diagnosis=consult_data.primary_diagnosis,
-        indication=consult_data.indication,
-        indication_category=consult_data.indication_category,
-        urgency=consult_data.urgency,
-        inviting_unit=consult_data.inviting_unit,
-        consultant_in_charge=consult_data.consultant_in_charge,
-        requesting_doctor=consult_data.requesting_doctor,
-        designation=consult_data.designation,
-        phone_number=consult_data.phone_number,
-        alternate_phone=consult_data.alternate_phone,
-        status=ConsultStatus.PENDING,
-        sync_status=SyncStatus.SYNCED,
-        created_by=None,
-        client_id=consult_data.client_id,
-    )
-    db.add(consult)
-    db.flush()
+def _encode_consult_cursor(created_at: datetime, consult_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{consult_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
 
-    # Notify plastic surgery team
-    notify_plastic_surgery_team(db, consult)
 
-    # Audit log (no user)
-    log_audit(
-        db, AuditAction.CREATED, user_id=None,
-        consult_id=consult.id,
-        details=f"Public consult {consult_id} created for patient {consult.patient_name} by {consult_data.requesting_doctor}",
-        ip_address=request.client.host if request.client else None,
+def _decode_consult_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        created_at, consult_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(consult_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+# list_consults selects exactly the columns ConsultRequestOut/UserOut expose
+# and builds the response rows from them, skipping ORM objects entirely
+_LIST_CONSULT_COLUMNS = [
+    ConsultRequest.__table__.c[name] for name in ConsultRequestOut.model_fields if name != "creator"
+]
+_LIST_CREATOR_COLUMNS = [
+    User.__table__.c[name].label(f"creator_{name}") for name in UserOut.model_fields
+]
+
+
+def _consult_out_from_row(row) -> ConsultRequestOut:
+    """Build the response model from an already-typed result row (no validation)."""
+    creator = None
+    if row["creator_id"] is not None:
+        creator = UserOut.model_construct(**{
+            name: row[f"creator_{name}"] for name in UserOut.model_fields
+        })
+    return ConsultRequestOut.model_construct(
+        **{column.name: row[column.name] for column in _LIST_CONSULT_COLUMNS},
+        creator=creator,
     )
 
-    db.commit()
-    db.refresh(consult)
 
-    # Send push notification to the plastic surgery team
-    try:
-        urgency_label = consult.urgency.value.upper()
-        send_push_to_team(
-            db,
-            title=f"\U0001f6a8 New Consult \u2013 {urgency_label}",
-            body=f"{consult.patient_name} ({consult.ward}) \u2013 {consult.primary_diagnosis}. From: {consult.inviting_unit}",
-            url=f"/app/consults/{consult.id}",
-            tag=f"consult-{consult.consult_id}",
-        )
-    except Exception:
-        pass  # Push is best-effort, never block consult creation
+# Past this many rows an unfiltered COUNT(*) is replaced by the planner's
+# estimate, which PostgreSQL keeps current through autovacuum/ANALYZE
+ESTIMATED_COUNT_THRESHOLD = 100_000
 
-    return ConsultAcknowledgement(
-        status="success",
-        consult_id=consult.consult_id,
-        received_at=consult.created_at,
-        message="Consult request received and Plastic Surgery Unit notified.",
-    )
+
+def _count_all_consults(db: Session) -> int:
+    if not is_sqlite:
+        estimate = db.execute(text(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = 'consult_requests'::regclass"
+        )).scalar()
+        if estimate is not None and estimate >= ESTIMATED_COUNT_THRESHOLD:
+            return estimate
+    return db.query(func.count(ConsultRequest.id)).scalar()
 
 
 @router.get("/", response_model=ConsultListResponse)
-async def list_consults(
-    page: int = Query(1, ge=1),
+def list_consults(
     per_page: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    include_total: bool = Query(False),
     ward: Optional[str] = None,
     urgency: Optional[UrgencyLevel] = None,
     status_filter: Optional[ConsultStatus] = Query(None, alias="status"),
@@ -267,51 +296,72 @@ async def list_consults(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """List consults with filtering and pagination."""
-    query = db.query(ConsultRequest).options(joinedload(ConsultRequest.creator))
+    """List consults newest first. Keyset-paginated: pass the previous page's
+    next_cursor as cursor to continue. total is only computed when
+    include_total is set."""
+    filters = []
 
     # Role-based filtering: inviting units only see their own consults
     if current_user.role == UserRole.INVITING_UNIT:
-        query = query.filter(ConsultRequest.created_by == current_user.id)
+        filters.append(ConsultRequest.created_by == current_user.id)
 
     # Filters
     if ward:
-        query = query.filter(ConsultRequest.ward.ilike(f"%{ward}%"))
+        filters.append(ConsultRequest.ward.ilike(f"%{ward}%"))
     if urgency:
-        query = query.filter(ConsultRequest.urgency == urgency)
+        filters.append(ConsultRequest.urgency == urgency)
     if status_filter:
-        query = query.filter(ConsultRequest.status == status_filter)
+        filters.append(ConsultRequest.status == status_filter)
     if date_from:
-        query = query.filter(func.date(ConsultRequest.created_at) >= date_from)
+        filters.append(ConsultRequest.created_at >= datetime.combine(date_from, time.min))
     if date_to:
-        query = query.filter(func.date(ConsultRequest.created_at) <= date_to)
+        filters.append(
+            ConsultRequest.created_at < datetime.combine(date_to + timedelta(days=1), time.min)
+        )
     if search:
         search_term = f"%{search}%"
-        query = query.filter(
+        filters.append(
             (ConsultRequest.patient_name.ilike(search_term)) |
             (ConsultRequest.hospital_number.ilike(search_term)) |
             (ConsultRequest.consult_id.ilike(search_term))
         )
 
-    total = query.count()
-    consults = (
-        query
-        .order_by(ConsultRequest.created_at.desc())
-        .offset((page - 1) * per_page)
+    total = None
+    if include_total:
+        if filters:
+            total = db.query(func.count(ConsultRequest.id)).filter(*filters).scalar()
+        else:
+            total = _count_all_consults(db)
+    if cursor:
+        after_created_at, after_id = _decode_consult_cursor(cursor)
+        created_at = ConsultRequest.created_at
+        if is_sqlite:
+            # SQLite keeps datetimes as text; CURRENT_TIMESTAMP omits the
+            # microseconds a bound datetime carries, so normalise both sides
+            created_at, after_created_at = func.datetime(created_at), func.datetime(after_created_at)
+        filters.append(tuple_(created_at, ConsultRequest.id) < tuple_(after_created_at, after_id))
+
+    rows = db.execute(
+        select(*_LIST_CONSULT_COLUMNS, *_LIST_CREATOR_COLUMNS)
+        .outerjoin(User, ConsultRequest.created_by == User.id)
+        .where(*filters)
+        .order_by(ConsultRequest.created_at.desc(), ConsultRequest.id.desc())
         .limit(per_page)
-        .all()
-    )
+    ).mappings().all()
 
+    next_cursor = None
+    if len(rows) == per_page:
+        next_cursor = _encode_consult_cursor(rows[-1]["created_at"], rows[-1]["id"])
     return ConsultListResponse(
         total=total,
-        page=page,
         per_page=per_page,
-        consults=[ConsultRequestOut.model_validate(c) for c in consults],
+        next_cursor=next_cursor,
+        consults=[_consult_out_from_row(row) for row in rows],
     )
 
 
 @router.get("/{consult_id}", response_model=ConsultRequestOut)
-async def get_consult(
+def get_consult(
     consult_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -319,7 +369,7 @@ async def get_consult(
     """Get a specific consult by ID."""
     consult = (
         db.query(ConsultRequest)
-        .options(joinedload(ConsultRequest.creator))
+        .options(*CONSULT_LOAD_OPTS)
         .filter(ConsultRequest.id == consult_id)
         .first()
     )
@@ -334,7 +384,7 @@ async def get_consult(
 
 
 @router.patch("/{consult_id}/status", response_model=ConsultRequestOut)
-async def update_consult_status(
+def update_consult_status(
     consult_id: int,
     status_update: ConsultStatusUpdate,
     request: Request,
@@ -344,7 +394,12 @@ async def update_consult_status(
     )),
 ):
     """Update consult status (Plastic Surgery team only)."""
-    consult = db.query(ConsultRequest).filter(ConsultRequest.id == consult_id).first()
+    consult = (
+        db.query(ConsultRequest)
+        .options(*CONSULT_LOAD_OPTS)
+        .filter(ConsultRequest.id == consult_id)
+        .first()
+    )
     if not consult:
         raise HTTPException(status_code=404, detail="Consult not found")
 
@@ -382,7 +437,7 @@ async def update_consult_status(
 
 
 @router.patch("/{consult_id}/acknowledge", response_model=ConsultRequestOut)
-async def acknowledge_consult(
+def acknowledge_consult(
     consult_id: int,
     request: Request,
     db: Session = Depends(get_db),
@@ -391,7 +446,12 @@ async def acknowledge_consult(
     )),
 ):
     """Acknowledge receipt of consult (Stage 1 acknowledgement)."""
-    consult = db.query(ConsultRequest).filter(ConsultRequest.id == consult_id).first()
+    consult = (
+        db.query(ConsultRequest)
+        .options(*CONSULT_LOAD_OPTS)
+        .filter(ConsultRequest.id == consult_id)
+        .first()
+    )
     if not consult:
         raise HTTPException(status_code=404, detail="Consult not found")
 
@@ -417,8 +477,8 @@ async def acknowledge_consult(
     return ConsultRequestOut.model_validate(consult)
 
 
-@router.post("/public/{consult_id}/photo")
-async def upload_photo_public(
+@router.post("/public/{consult_id}/photo", response_model=PhotoOut)
+def upload_photo_public(
     consult_id: str,
     file: UploadFile = File(...),
     description: str = Form(""),
@@ -439,84 +499,79 @@ async def upload_photo_public(
     if file.content_type not in allowed_types:
         raise HTTPException(status_code=400, detail="Only JPEG, PNG, and WebP images are allowed")
 
-    # Validate file size
-    contents = await file.read()
-    if len(contents) > settings.MAX_UPLOAD_SIZE:
-        raise HTTPException(status_code=400, detail="File too large (max 10MB)")
-
-    # Encode as base64 and store in database (serverless-friendly)
-    b64_data = base64.b64encode(contents).decode("utf-8")
-    filename = file.filename or "photo.jpg"
-
-    photo = Photo(
-        consult_id=consult.id,
-        filename=filename,
-        content_type=file.content_type,
-        data=b64_data,
-        description=description,
-        uploaded_by=None,
-    )
-    db.add(photo)
-    db.commit()
-    db.refresh(photo)
-
-    return {
-        "id": photo.id,
-        "filename": photo.filename,
-        "description": photo.description,
-        "uploaded_at": photo.uploaded_at.isoformat(),
-    }
+    contents = read_photo_upload(file)
+    photo = save_photo(db, consult.id, file, contents, description, None)
+    return photo_out(photo)
 
 
 @router.post("/sync", response_model=list[ConsultAcknowledgement])
-async def sync_offline_consults(
+def sync_offline_consults(
     consults: list[ConsultRequestCreate],
     request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """Bulk sync endpoint for offline consult submissions."""
-    results = []
+    # Look up every already-synced client_id in one query
+    client_ids = {c.client_id for c in consults if c.client_id}
+    synced = {}
+    if client_ids:
+        synced = {
+            row.client_id: row
+            for row in db.execute(
+                select(ConsultRequest.client_id, ConsultRequest.consult_id, ConsultRequest.created_at)
+                .where(ConsultRequest.client_id.in_(client_ids))
+            )
+        }
+
+    # A client_id already in the database, or seen earlier in this batch,
+    # is acknowledged as a repeat; everything else is created below
+    is_new = []
     for consult_data in consults:
-        # Check duplicate
-        if consult_data.client_id:
-            existing = db.query(ConsultRequest).filter(
-                ConsultRequest.client_id == consult_data.client_id
-            ).first()
-            if existing:
-                results.append(ConsultAcknowledgement(
-                    status="success",
-                    consult_id=existing.consult_id,
-                    received_at=existing.created_at,
-                    message="Already synced.",
-                ))
-                continue
-
-        consult_id = generate_consult_id(db)
-        consult = ConsultRequest(
-            consult_id=consult_id,
-            **consult_data.model_dump(exclude={"client_id"}),
-            status=ConsultStatus.PENDING,
-            sync_status=SyncStatus.SYNCED,
-            created_by=current_user.id,
-            client_id=consult_data.client_id,
-        )
-        db.add(consult)
+        new = not consult_data.client_id or consult_data.client_id not in synced
+        if new and consult_data.client_id:
+            synced[consult_data.client_id] = None  # filled in once created
+        is_new.append(new)
+    new_items = [consult_data for consult_data, new in zip(consults, is_new) if new]
+
+    # One block of IDs from the counter, one batched INSERT for the consults
+    # and one for all their team notifications
+    new_consults = []
+    if new_items:
+        new_consults = [
+            ConsultRequest(
+                consult_id=consult_id,
+                **consult_data.model_dump(exclude={"client_id"}),
+                status=ConsultStatus.PENDING,
+                sync_status=SyncStatus.SYNCED,
+                created_by=current_user.id,
+                client_id=consult_data.client_id,
+            )
+            for consult_id, consult_data in zip(generate_consult_ids(db, len(new_items)), new_items)
+        ]
+        db.add_all(new_consults)
         db.flush()
-        notify_plastic_surgery_team(db, consult)
-
-        log_audit(
-            db, AuditAction.CREATED, user_id=current_user.id,
-            consult_id=consult.id,
-            details=f"Offline sync: Consult {consult_id} created",
-            ip_address=request.client.host if request.client else None,
-        )
+        notify_plastic_surgery_team(db, *new_consults)
+
+        for consult in new_consults:
+            if consult.client_id:
+                synced[consult.client_id] = consult
+            log_audit(
+                db, AuditAction.CREATED, user_id=current_user.id,
+                consult_id=consult.id,
+                details=f"Offline sync: Consult {consult.consult_id} created",
+                ip_address=request.client.host if request.client else None,
+            )
 
+    results = []
+    created = iter(new_consults)
+    for consult_data, new in zip(consults, is_new):
+        consult = next(created) if new else synced[consult_data.client_id]
         results.append(ConsultAcknowledgement(
             status="success",
             consult_id=consult.consult_id,
             received_at=consult.created_at,
-            message="Consult synced successfully.",
+            message="Consult synced successfully." if new else "Already synced.",
         ))
 
     db.commit()
@@ -2,57 +2,59 @@
 PS Consult – UNTH: Dashboard & Analytics Router
 """
 
-from datetime import datetime, date, timedelta
+from datetime import datetime, date, time, timedelta
 from fastapi import APIRouter, Depends, Query
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 
-from database import get_db
-from models import (
+from backend.database import get_db, is_sqlite
+from backend.models import (
     ConsultRequest, ConsultStatus, UrgencyLevel, User, UserRole,
     Notification, AuditLog
 )
-from schemas import DashboardStats, NotificationOut, AuditLogOut
-from auth import get_current_user, require_roles
+from backend.schemas import DashboardStats, NotificationOut, AuditLogOut
+from backend.auth import get_current_user, require_roles
 
 router = APIRouter(prefix="/api/dashboard", tags=["Dashboard"])
 
+# Notification and audit pages are validated in one call each
+_notifications_adapter = TypeAdapter(list[NotificationOut])
+_audit_logs_adapter = TypeAdapter(list[AuditLogOut])
+
 
 @router.get("/stats", response_model=DashboardStats)
-async def get_dashboard_stats(
+def get_dashboard_stats(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """Get dashboard statistics for the Plastic Surgery team."""
-    today = date.today()
+    today_start = datetime.combine(date.today(), time.min)
+    tomorrow_start = today_start + timedelta(days=1)
 
     base_query = db.query(ConsultRequest)
     if current_user.role == UserRole.INVITING_UNIT:
         base_query = base_query.filter(ConsultRequest.created_by == current_user.id)
 
-    total = base_query.count()
-    pending = base_query.filter(ConsultRequest.status == ConsultStatus.PENDING).count()
-    accepted = base_query.filter(ConsultRequest.status == ConsultStatus.ACCEPTED).count()
-    reviewed = base_query.filter(ConsultRequest.status == ConsultStatus.REVIEWED).count()
-    procedure_planned = base_query.filter(ConsultRequest.status == ConsultStatus.PROCEDURE_PLANNED).count()
-    completed = base_query.filter(ConsultRequest.status == ConsultStatus.COMPLETED).count()
-    emergency_count = base_query.filter(ConsultRequest.urgency == UrgencyLevel.EMERGENCY).count()
-    today_count = base_query.filter(func.date(ConsultRequest.created_at) == today).count()
-
-    return DashboardStats(
-        total_consults=total,
-        pending=pending,
-        accepted=accepted,
-        reviewed=reviewed,
-        procedure_planned=procedure_planned,
-        completed=completed,
-        emergency_count=emergency_count,
-        today_count=today_count,
-    )
+    # One aggregate pass instead of a COUNT(*) round trip per figure
+    row = base_query.with_entities(
+        func.count().label("total_consults"),
+        func.count().filter(ConsultRequest.status == ConsultStatus.PENDING).label("pending"),
+        func.count().filter(ConsultRequest.status == ConsultStatus.ACCEPTED).label("accepted"),
+        func.count().filter(ConsultRequest.status == ConsultStatus.REVIEWED).label("reviewed"),
+        func.count().filter(ConsultRequest.status == ConsultStatus.PROCEDURE_PLANNED).label("procedure_planned"),
+        func.count().filter(ConsultRequest.status == ConsultStatus.COMPLETED).label("completed"),
+        func.count().filter(ConsultRequest.urgency == UrgencyLevel.EMERGENCY).label("emergency_count"),
+        func.count().filter(
+            ConsultRequest.created_at >= today_start, ConsultRequest.created_at < tomorrow_start
+        ).label("today_count"),
+    ).one()
+
+    return DashboardStats(**row._asdict())
 
 
 @router.get("/analytics/by-ward")
-async def analytics_by_ward(
+def analytics_by_ward(
     db: Session = Depends(get_db),
     current_user: User = Depends(require_roles(
         UserRole.REGISTRAR, UserRole.SENIOR_REGISTRAR, UserRole.CONSULTANT, UserRole.ADMIN
@@ -69,7 +71,7 @@ async def analytics_by_ward(
 
 
 @router.get("/analytics/by-urgency")
-async def analytics_by_urgency(
+def analytics_by_urgency(
     db: Session = Depends(get_db),
     current_user: User = Depends(require_roles(
         UserRole.REGISTRAR, UserRole.SENIOR_REGISTRAR, UserRole.CONSULTANT, UserRole.ADMIN
@@ -85,7 +87,7 @@ async def analytics_by_urgency(
 
 
 @router.get("/analytics/response-times")
-async def analytics_response_times(
+def analytics_response_times(
     days: int = Query(30, ge=1, le=365),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_roles(
@@ -94,33 +96,35 @@ async def analytics_response_times(
 ):
     """Average response times for consults."""
     cutoff = datetime.utcnow() - timedelta(days=days)
-    consults = (
-        db.query(ConsultRequest)
+    if is_sqlite:
+        response_minutes = (
+            func.julianday(ConsultRequest.accepted_at) - func.julianday(ConsultRequest.created_at)
+        ) * 1440
+    else:
+        response_minutes = func.extract(
+            "epoch", ConsultRequest.accepted_at - ConsultRequest.created_at
+        ) / 60
+    count, avg = (
+        db.query(func.count(ConsultRequest.id), func.avg(response_minutes))
         .filter(
             ConsultRequest.created_at >= cutoff,
             ConsultRequest.accepted_at.isnot(None),
         )
-        .all()
+        .one()
     )
 
-    if not consults:
+    if not count:
         return {"average_response_minutes": 0, "count": 0}
 
-    total_minutes = sum(
-        (c.accepted_at - c.created_at).total_seconds() / 60
-        for c in consults
-    )
-    avg = total_minutes / len(consults)
-
     return {
-        "average_response_minutes": round(avg, 1),
-        "count": len(consults),
+        "average_response_minutes": round(float(avg), 1),
+        "count": count,
         "period_days": days,
     }
 
 
 @router.get("/analytics/daily-trend")
-async def daily_trend(
+def daily_trend(
     days: int = Query(30, ge=1, le=365),
     db: Session = Depends(get_db),
     current_user: User = Depends(require_roles(
@@ -134,7 +138,7 @@ async def daily_trend(
             func.date(ConsultRequest.created_at).label("day"),
             func.count(ConsultRequest.id).label("count"),
         )
-        .filter(func.date(ConsultRequest.created_at) >= cutoff)
+        .filter(ConsultRequest.created_at >= datetime.combine(cutoff, time.min))
         .group_by(func.date(ConsultRequest.created_at))
         .order_by(func.date(ConsultRequest.created_at))
         .all()
@@ -147,7 +151,7 @@ async def daily_trend(
 # ──────────────────────────────────────────────────────────────────
 
 @router.get("/notifications", response_model=list[NotificationOut])
-async def get_notifications(
+def get_notifications(
     unread_only: bool = Query(False),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -157,11 +161,11 @@ async def get_notifications(
     if unread_only:
         query = query.filter(Notification.is_read == False)
     notifications = query.order_by(Notification.created_at.desc()).limit(50).all()
-    return [NotificationOut.model_validate(n) for n in notifications]
+    return _notifications_adapter.validate_python(notifications, from_attributes=True)
 
 
 @router.patch("/notifications/{notification_id}/read")
-async def mark_notification_read(
+def mark_notification_read(
     notification_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -179,17 +183,17 @@ async def mark_notification_read(
 
 
 @router.patch("/notifications/read-all")
-async def mark_all_read(
+def mark_all_read(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """Mark all notifications as read."""
-    db.query(Notification).filter(
+    updated = db.query(Notification).filter(
         Notification.user_id == current_user.id,
         Notification.is_read == False,
-    ).update({"is_read": True})
+    ).update({"is_read": True}, synchronize_session=False)
     db.commit()
-    return {"status": "ok"}
+    return {"status": "ok", "updated": updated}
 
 
 # ──────────────────────────────────────────────────────────────────
@@ -197,7 +201,7 @@ async def mark_all_read(
 # ──────────────────────────────────────────────────────────────────
 
 @router.get("/audit-logs", response_model=list[AuditLogOut])
-async def get_audit_logs(
+def get_audit_logs(
     consult_id: int = Query(None),
     limit: int = Query(100, ge=1, le=500),
     db: Session = Depends(get_db),
@@ -208,4 +212,4 @@ async def get_audit_logs(
     if consult_id:
         query = query.filter(AuditLog.consult_id == consult_id)
     logs = query.order_by(AuditLog.timestamp.desc()).limit(limit).all()
-    return [AuditLogOut.model_validate(log) for log in logs]
+    return _audit_logs_adapter.validate_python(logs, from_attributes=True)
@@ -7,14 +7,26 @@ browser push notifications even when the app is closed.
 
 import json
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from urllib.parse import urlparse
+import requests
+from cachetools import TTLCache
+from requests.adapters import HTTPAdapter
 from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy import and_, func, or_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
-from pywebpush import webpush, WebPushException
+from py_vapid import Vapid
+from pywebpush import WebPusher
 
-from database import get_db
-from models import PushSubscription, User, UserRole
-from config import settings
-from auth import get_current_user
+from backend.database import get_db, is_sqlite, SessionLocal
+from backend.models import PushSubscription, User, UserRole
+from backend.config import settings
+from backend.auth import get_current_user
 
 logger = logging.getLogger(__name__)
 
@@ -48,32 +60,26 @@ async def subscribe(request: Request, db: Session = Depends(get_db)):
     # Try to get user from token (optional — may be anonymous)
     user_id = None
     try:
-        from auth import get_current_user_optional
+        from backend.auth import get_current_user_optional
         user = await get_current_user_optional(request, db)
         if user:
             user_id = user.id
     except Exception:
         pass
 
-    # Upsert — update existing subscription or create new
-    existing = db.query(PushSubscription).filter(
-        PushSubscription.endpoint == endpoint
-    ).first()
-
-    if existing:
-        existing.p256dh = p256dh
-        existing.auth = auth
-        if user_id:
-            existing.user_id = user_id
-    else:
-        sub = PushSubscription(
-            endpoint=endpoint,
-            p256dh=p256dh,
-            auth=auth,
-            user_id=user_id,
-        )
-        db.add(sub)
-
+    # Upsert in one statement; keep the known owner if this request is anonymous
+    upsert = sqlite_insert if is_sqlite else pg_insert
+    stmt = upsert(PushSubscription).values(
+        endpoint=endpoint, p256dh=p256dh, auth=auth, user_id=user_id,
+    )
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=[PushSubscription.endpoint],
+        set_={
+            "p256dh": stmt.excluded.p256dh,
+            "auth": stmt.excluded.auth,
+            "user_id": func.coalesce(stmt.excluded.user_id, PushSubscription.user_id),
+        },
+    ))
     db.commit()
     return {"status": "subscribed"}
 
@@ -87,59 +93,106 @@ async def unsubscribe(request: Request, db: Session = Depends(get_db)):
     if not endpoint:
         raise HTTPException(status_code=400, detail="Missing endpoint")
 
-    sub = db.query(PushSubscription).filter(
+    db.query(PushSubscription).filter(
         PushSubscription.endpoint == endpoint
-    ).first()
-    if sub:
-        db.delete(sub)
-        db.commit()
+    ).delete(synchronize_session=False)
+    db.commit()
     return {"status": "unsubscribed"}
 
 
-# ── Helper: send push to all subscribers ─────────────
-def send_push_to_all(db: Session, title: str, body: str, url: str = "/", tag: str = "ps-consult"):
-    """Send a push notification to ALL registered subscribers.
+# ── Helpers: fan-out ─────────────────────────────────
+# Pushes are independent HTTPS POSTs to the browser vendors' push services,
+# so they are sent concurrently rather than one round trip after another.
+PUSH_MAX_WORKERS = 32
 
-    Called internally when a new consult is submitted.
-    Stale/expired subscriptions are automatically cleaned up.
-    """
-    subscriptions = db.query(PushSubscription).all()
+# Roles that receive new-consult pushes
+PUSH_TEAM_ROLES = (UserRole.REGISTRAR, UserRole.SENIOR_REGISTRAR, UserRole.CONSULTANT, UserRole.ADMIN)
+
+
+# A VAPID JWT is valid for 12 hours and only depends on the push service's
+# origin, so one is signed per origin and reused, renewed an hour early.
+VAPID_TOKEN_LIFETIME = 12 * 60 * 60  # seconds
+_vapid_headers_cache = TTLCache(maxsize=64, ttl=VAPID_TOKEN_LIFETIME - 60 * 60)
+_vapid_headers_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def _vapid() -> Vapid:
+    """The parsed VAPID signing key (decoded once, not per push)."""
+    return Vapid.from_string(private_key=settings.VAPID_PRIVATE_KEY)
+
+
+def _vapid_headers(endpoint: str) -> dict:
+    """Authorization headers for a push endpoint, cached per origin."""
+    url = urlparse(endpoint)
+    audience = f"{url.scheme}://{url.netloc}"
+    with _vapid_headers_lock:
+        headers = _vapid_headers_cache.get(audience)
+        if headers is None:
+            headers = _vapid().sign({
+                "sub": settings.VAPID_CLAIMS_EMAIL,
+                "aud": audience,
+                "exp": int(time.time()) + VAPID_TOKEN_LIFETIME,
+            })
+            _vapid_headers_cache[audience] = headers
+    return headers
+
+
+@lru_cache(maxsize=1)
+def _push_session() -> requests.Session:
+    """Shared HTTP session: keeps TLS connections to each push service alive
+    between deliveries, one pooled connection per fan-out worker."""
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=8, pool_maxsize=PUSH_MAX_WORKERS))
+    return session
+
+
+def _deliver(subscription_info: dict, payload: bytes) -> bool:
+    """Send one push. Returns False if the subscription is gone (404/410)."""
+    endpoint = subscription_info["endpoint"]
+    try:
+        response = WebPusher(subscription_info, requests_session=_push_session()).send(
+            payload, dict(_vapid_headers(endpoint)), ttl=0, timeout=10,
+        )
+    except Exception as e:
+        logger.warning(f"Push error: {e}")
+        return True
+    # 410 Gone or 404 = subscription expired, clean it up
+    if response.status_code in (404, 410):
+        return False
+    if response.status_code > 202:
+        logger.warning(f"Push failed for {endpoint[:50]}...: {response.status_code} {response.reason}")
+    return True
+
+
+def _send_push(db: Session, subscriptions: list[PushSubscription], title: str, body: str, url: str, tag: str):
+    """Push one notification to every subscription, in parallel, then delete
+    the subscriptions the push service reported as expired."""
     if not subscriptions:
         return
 
+    # Encoded once here; pywebpush would otherwise encode a str per subscriber
     payload = json.dumps({
         "title": title,
         "body": body,
         "url": url,
         "tag": tag,
-    })
+    }).encode()
 
-    stale_ids = []
-    for sub in subscriptions:
-        subscription_info = {
+    # Read the ORM rows here; worker threads only see plain dicts
+    targets = {
+        sub.id: {
             "endpoint": sub.endpoint,
             "keys": {
                 "p256dh": sub.p256dh,
                 "auth": sub.auth,
             },
         }
-        try:
-            webpush(
-                subscription_info=subscription_info,
-                data=payload,
-                vapid_private_key=settings.VAPID_PRIVATE_KEY,
-                vapid_claims={"sub": settings.VAPID_CLAIMS_EMAIL},
-            )
-        except WebPushException as e:
-            # 410 Gone or 404 = subscription expired, clean it up
-            if hasattr(e, 'response') and e.response is not None:
-                status = e.response.status_code
-                if status in (404, 410):
-                    stale_ids.append(sub.id)
-                    continue
-            logger.warning(f"Push failed for {sub.endpoint[:50]}...: {e}")
-        except Exception as e:
-            logger.warning(f"Push error: {e}")
+        for sub in subscriptions
+    }
+    with ThreadPoolExecutor(max_workers=min(PUSH_MAX_WORKERS, len(targets))) as pool:
+        delivered = pool.map(lambda info: _deliver(info, payload), targets.values())
+        stale_ids = [sub_id for sub_id, ok in zip(targets, delivered) if not ok]
 
     # Clean up stale subscriptions
     if stale_ids:
@@ -149,61 +202,42 @@ def send_push_to_all(db: Session, title: str, body: str, url: str = "/", tag: st
         db.commit()
 
 
+def send_push_to_all(db: Session, title: str, body: str, url: str = "/", tag: str = "ps-consult"):
+    """Send a push notification to ALL registered subscribers.
+
+    Called internally when a new consult is submitted.
+    Stale/expired subscriptions are automatically cleaned up.
+    """
+    _send_push(db, db.query(PushSubscription).all(), title, body, url, tag)
+
+
 def send_push_to_team(db: Session, title: str, body: str, url: str = "/", tag: str = "ps-consult"):
     """Send push notification only to plastic surgery team members."""
-    team_roles = [UserRole.REGISTRAR, UserRole.SENIOR_REGISTRAR, UserRole.CONSULTANT, UserRole.ADMIN]
-    team_subs = (
+    # Team members' subscriptions plus anonymous ones (no user_id) — the
+    # latter may be team members who subscribed before logging in
+    subscriptions = (
         db.query(PushSubscription)
-        .join(User, PushSubscription.user_id == User.id)
-        .filter(User.role.in_(team_roles), User.is_active == True)
+        .outerjoin(User, PushSubscription.user_id == User.id)
+        .filter(or_(
+            and_(User.role.in_(PUSH_TEAM_ROLES), User.is_active == True),
+            PushSubscription.user_id == None,
+        ))
         .all()
     )
 
-    # Also include anonymous subscriptions (no user_id) — these may be
-    # team members who subscribed before logging in
-    anon_subs = db.query(PushSubscription).filter(
-        PushSubscription.user_id == None
-    ).all()
+    _send_push(db, subscriptions, title, body, url, tag)
 
-    all_subs = team_subs + anon_subs
-    if not all_subs:
-        return
 
-    payload = json.dumps({
-        "title": title,
-        "body": body,
-        "url": url,
-        "tag": tag,
-    })
+def send_push_to_team_background(title: str, body: str, url: str = "/", tag: str = "ps-consult"):
+    """BackgroundTasks entry point for send_push_to_team.
 
-    stale_ids = []
-    for sub in all_subs:
-        subscription_info = {
-            "endpoint": sub.endpoint,
-            "keys": {
-                "p256dh": sub.p256dh,
-                "auth": sub.auth,
-            },
-        }
-        try:
-            webpush(
-                subscription_info=subscription_info,
-                data=payload,
-                vapid_private_key=settings.VAPID_PRIVATE_KEY,
-                vapid_claims={"sub": settings.VAPID_CLAIMS_EMAIL},
-            )
-        except WebPushException as e:
-            if hasattr(e, 'response') and e.response is not None:
-                status = e.response.status_code
-                if status in (404, 410):
-                    stale_ids.append(sub.id)
-                    continue
-            logger.warning(f"Push failed for {sub.endpoint[:50]}...: {e}")
-        except Exception as e:
-            logger.warning(f"Push error: {e}")
-
-    if stale_ids:
-        db.query(PushSubscription).filter(
-            PushSubscription.id.in_(stale_ids)
-        ).delete(synchronize_session=False)
-        db.commit()
+    Runs after the response has been sent, on its own session. Push is
+    best-effort, so failures are logged and never surface to the client.
+    """
+    db = SessionLocal()
+    try:
+        send_push_to_team(db, title, body, url, tag)
+    except Exception as e:
+        logger.warning(f"Team push failed: {e}")
+    finally:
+        db.close()
@@ -4,25 +4,122 @@ PS Consult – UNTH: Review Documentation Router
 Handles clinical review documentation by the Plastic Surgery team.
 """
 
-import base64
-from datetime import datetime
+import hashlib
+import os
+from typing import Optional
+
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Request
-from sqlalchemy.orm import Session
+from pydantic import TypeAdapter
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session, joinedload, raiseload
 
-from database import get_db
-from models import (
+from backend.database import get_db
+from backend.models import (
     ConsultReview, ConsultRequest, Photo, User, UserRole,
     ConsultStatus, AuditAction
 )
-from schemas import ConsultReviewCreate, ConsultReviewOut
-from auth import get_current_user, require_roles, log_audit
-from config import settings
+from backend.schemas import ConsultReviewCreate, ConsultReviewOut, PhotoOut
+from backend.auth import get_current_user, require_roles, log_audit
+from backend.config import settings
 
 router = APIRouter(prefix="/api/reviews", tags=["Reviews"])
 
+# One validation call per review list, reviewers included
+_reviews_adapter = TypeAdapter(list[ConsultReviewOut])
+
+# ConsultReviewOut nests the reviewer; load it with the review and refuse
+# any other lazy load while serialising
+REVIEW_LOAD_OPTS = (joinedload(ConsultReview.reviewer), raiseload("*"))
+
+
+def _load_review(db: Session, review_id: int) -> ConsultReview:
+    return (
+        db.query(ConsultReview)
+        .options(*REVIEW_LOAD_OPTS)
+        .filter(ConsultReview.id == review_id)
+        .first()
+    )
+
+
+def _matches_image_type(head: bytes, content_type: str) -> bool:
+    if content_type == "image/jpeg":
+        return head[:3] == b"\xff\xd8\xff"
+    if content_type == "image/png":
+        return head[:8] == b"\x89PNG\r\n\x1a\n"
+    if content_type == "image/webp":
+        return head[:4] == b"RIFF" and head[8:12] == b"WEBP"
+    return False
+
+
+def read_photo_upload(file: UploadFile) -> bytes:
+    """Return the upload's bytes, rejecting it before the read if over the size limit.
+
+    The multipart parser has already spooled the body to a temp file, so
+    the size is known up front and oversized files are never pulled into memory.
+    The first bytes must also match the declared image type, since
+    content_type is whatever the client chose to send.
+    """
+    file.file.seek(0, os.SEEK_END)
+    size = file.file.tell()
+    if size > settings.MAX_UPLOAD_SIZE:
+        raise HTTPException(status_code=413, detail="File too large (max 10MB)")
+    file.file.seek(0)
+    if not _matches_image_type(file.file.read(12), file.content_type):
+        raise HTTPException(status_code=400, detail="File content does not match its image type")
+    file.file.seek(0)
+    return file.file.read()
+
+
+def save_photo(
+    db: Session,
+    consult_id: int,
+    file: UploadFile,
+    contents: bytes,
+    description: str,
+    uploaded_by: Optional[int],
+) -> Photo:
+    """Store an uploaded photo, or return the consult's existing copy of it.
+
+    Retried or repeated uploads of the same image to a consult match on the
+    content hash and reuse the stored row instead of writing the bytes again.
+    """
+    content_hash = hashlib.sha256(contents).hexdigest()
+    existing = (
+        db.query(Photo)
+        .filter(Photo.consult_id == consult_id, Photo.content_hash == content_hash)
+        .first()
+    )
+    if existing:
+        return existing
+
+    # Store raw bytes in the database (serverless-friendly)
+    photo = Photo(
+        consult_id=consult_id,
+        filename=file.filename or "photo.jpg",
+        content_type=file.content_type,
+        data=contents,
+        content_hash=content_hash,
+        description=description,
+        uploaded_by=uploaded_by,
+    )
+    db.add(photo)
+    db.commit()
+    db.refresh(photo)
+    return photo
+
+
+def photo_out(photo: Photo) -> PhotoOut:
+    return PhotoOut(
+        id=photo.id,
+        filename=photo.filename,
+        description=photo.description,
+        url=f"/api/photos/{photo.id}",
+        uploaded_at=photo.uploaded_at,
+    )
+
 
 @router.post("/{consult_id}", response_model=ConsultReviewOut, status_code=201)
-async def create_review(
+def create_review(
     consult_id: int,
     review_data: ConsultReviewCreate,
     request: Request,
@@ -32,8 +129,20 @@ async def create_review(
     )),
 ):
     """Create a clinical review for a consult."""
-    consult = db.query(ConsultRequest).filter(ConsultRequest.id == consult_id).first()
-    if not consult:
+    # Move the consult on first; no row updated means it doesn't exist,
+    # so the existence check costs no separate SELECT
+    updated = db.execute(
+        update(ConsultRequest)
+        .where(ConsultRequest.id == consult_id)
+        .values(
+            status=(ConsultStatus.PROCEDURE_PLANNED if review_data.procedure_scheduled
+                    else ConsultStatus.REVIEWED),
+            # Database clock, like created_at, so response times use one source
+            reviewed_at=func.now(),
+        )
+        .returning(ConsultRequest.id)
+    ).first()
+    if updated is None:
         raise HTTPException(status_code=404, detail="Consult not found")
 
     review = ConsultReview(
@@ -42,13 +151,7 @@ async def create_review(
         **review_data.model_dump(),
     )
     db.add(review)
-
-    # Update consult status
-    consult.status = ConsultStatus.REVIEWED
-    consult.reviewed_at = datetime.utcnow()
-
-    if review_data.procedure_scheduled:
-        consult.status = ConsultStatus.PROCEDURE_PLANNED
+    db.flush()
 
     log_audit(
         db, AuditAction.REVIEWED, user_id=current_user.id,
@@ -58,12 +161,11 @@ async def create_review(
     )
 
     db.commit()
-    db.refresh(review)
-    return ConsultReviewOut.model_validate(review)
+    return ConsultReviewOut.model_validate(_load_review(db, review.id))
 
 
 @router.get("/{consult_id}", response_model=list[ConsultReviewOut])
-async def get_reviews(
+def get_reviews(
     consult_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -71,15 +173,16 @@ async def get_reviews(
     """Get all reviews for a consult."""
     reviews = (
         db.query(ConsultReview)
+        .options(*REVIEW_LOAD_OPTS)
         .filter(ConsultReview.consult_id == consult_id)
         .order_by(ConsultReview.created_at.desc())
         .all()
     )
-    return [ConsultReviewOut.model_validate(r) for r in reviews]
+    return _reviews_adapter.validate_python(reviews, from_attributes=True)
 
 
 @router.put("/{review_id}", response_model=ConsultReviewOut)
-async def update_review(
+def update_review(
     review_id: int,
     review_data: ConsultReviewCreate,
     request: Request,
@@ -89,7 +192,7 @@ async def update_review(
     )),
 ):
     """Update an existing review."""
-    review = db.query(ConsultReview).filter(ConsultReview.id == review_id).first()
+    review = _load_review(db, review_id)
     if not review:
         raise HTTPException(status_code=404, detail="Review not found")
 
@@ -104,12 +207,11 @@ async def update_review(
     )
 
     db.commit()
-    db.refresh(review)
-    return ConsultReviewOut.model_validate(review)
+    return ConsultReviewOut.model_validate(_load_review(db, review_id))
 
 
-@router.post("/{consult_id}/photos")
-async def upload_photo(
+@router.post("/{consult_id}/photos", response_model=PhotoOut)
+def upload_photo(
     consult_id: int,
     file: UploadFile = File(...),
     description: str = Form(""),
@@ -128,50 +230,17 @@ async def upload_photo(
     if file.content_type not in allowed_types:
         raise HTTPException(status_code=400, detail="Only JPEG, PNG, and WebP images are allowed")
 
-    # Validate file size
-    contents = await file.read()
-    if len(contents) > settings.MAX_UPLOAD_SIZE:
-        raise HTTPException(status_code=400, detail="File too large (max 10MB)")
-
-    # Encode as base64 and store in database (serverless-friendly)
-    b64_data = base64.b64encode(contents).decode("utf-8")
-    filename = file.filename or "photo.jpg"
-
-    photo = Photo(
-        consult_id=consult_id,
-        filename=filename,
-        content_type=file.content_type,
-        data=b64_data,
-        description=description,
-        uploaded_by=current_user.id,
-    )
-    db.add(photo)
-    db.commit()
-    db.refresh(photo)
-
-    return {
-        "id": photo.id,
-        "filename": photo.filename,
-        "description": photo.description,
-        "uploaded_at": photo.uploaded_at.isoformat(),
-    }
+    contents = read_photo_upload(file)
+    photo = save_photo(db, consult_id, file, contents, description, current_user.id)
+    return photo_out(photo)
 
 
-@router.get("/{consult_id}/photos")
-async def list_photos(
+@router.get("/{consult_id}/photos", response_model=list[PhotoOut])
+def list_photos(
     consult_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """List all photos for a consult (metadata only, no base64 data)."""
     photos = db.query(Photo).filter(Photo.consult_id == consult_id).all()
-    return [
-        {
-            "id": p.id,
-            "filename": p.filename,
-            "description": p.description,
-            "url": f"/api/photos/{p.id}",
-            "uploaded_at": p.uploaded_at.isoformat(),
-        }
-        for p in photos
-    ]
+    return [photo_out(p) for p in photos]
@@ -4,27 +4,51 @@ PS Consult – UNTH: Unit Schedule Router
 Manages the Plastic Surgery Unit service schedule.
 """
 
-from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException
+import hashlib
+import json
+import threading
+from datetime import date, datetime
+
+from cachetools import TTLCache
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from pydantic import TypeAdapter
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import case
 from sqlalchemy.orm import Session
 
-from database import get_db
-from models import UnitSchedule, User, UserRole
-from schemas import UnitScheduleCreate, UnitScheduleOut
-from auth import get_current_user, require_roles
+from backend.database import get_db
+from backend.models import UnitSchedule, ServiceType, User, UserRole
+from backend.schemas import UnitScheduleCreate, UnitScheduleOut
+from backend.auth import get_current_user, require_roles
 
 router = APIRouter(prefix="/api/schedule", tags=["Unit Schedule"])
 
+# Validates the whole schedule list in one call
+_schedules_adapter = TypeAdapter(list[UnitScheduleOut])
+
 # Day-of-week mapping for contextual messages
-DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+DAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
+# For each weekday index, day name -> days from that day (0..6)
+_DAY_RANKS = tuple(
+    {DAYS[(idx + offset) % 7]: offset for offset in range(7)} for idx in range(7)
+)
+
 
+# /today payload keyed by UTC date; schedule edits clear it,
+# other processes pick edits up when their entry expires
+_today_cache = TTLCache(maxsize=1, ttl=300)
+_today_cache_lock = threading.Lock()
 
-def get_today_name() -> str:
-    return DAYS[datetime.utcnow().weekday()]
+
+def get_today() -> tuple[date, int]:
+    """Return today's UTC date and its weekday index from a single clock read."""
+    today = datetime.utcnow().date()
+    return today, today.weekday()
 
 
 @router.get("/", response_model=list[UnitScheduleOut])
-async def get_schedule(
+def get_schedule(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
@@ -35,21 +59,26 @@ async def get_schedule(
         .order_by(UnitSchedule.service_type, UnitSchedule.day_of_week)
         .all()
     )
-    return [UnitScheduleOut.model_validate(s) for s in schedules]
+    return _schedules_adapter.validate_python(schedules, from_attributes=True)
 
 
-@router.get("/today")
-async def get_today_schedule(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-):
-    """Get today's schedule with contextual information."""
-    today = get_today_name()
-    schedules = (
-        db.query(UnitSchedule)
-        .filter(UnitSchedule.is_active == True, UnitSchedule.day_of_week == today)
+def _build_today_schedule(db: Session, today_idx: int) -> dict:
+    today = DAYS[today_idx]
+
+    # One pass over the active schedule, ranked by days from today
+    # (0 = today, 6 = six days on); unknown day names are left out
+    day_rank = case(
+        _DAY_RANKS[today_idx],
+        value=UnitSchedule.day_of_week,
+        else_=7,
+    )
+    rows = (
+        db.query(UnitSchedule, day_rank)
+        .filter(UnitSchedule.is_active == True, day_rank < 7)
+        .order_by(day_rank, UnitSchedule.id)
         .all()
     )
+    schedules = [s for s, rank in rows if rank == 0]
 
     # Build contextual message
     activities = []
@@ -63,39 +92,68 @@ async def get_today_schedule(
     else:
         message += " No specific activities scheduled."
 
-    # Find next clinic and theatre days
-    all_schedules = (
-        db.query(UnitSchedule)
-        .filter(UnitSchedule.is_active == True)
-        .all()
+    # Find next clinic and theatre days; today's slots only come round
+    # again after the rest of the week
+    upcoming = [s for s, rank in rows if rank > 0] + schedules
+    next_clinic = next(
+        (f"{s.day_of_week} – {s.start_time}" for s in upcoming
+         if s.service_type == ServiceType.CLINIC),
+        None,
+    )
+    next_theatre = next(
+        (f"{s.day_of_week} – {s.start_time}" for s in upcoming
+         if s.service_type == ServiceType.THEATRE),
+        None,
     )
 
-    today_idx = DAYS.index(today)
-    next_clinic = None
-    next_theatre = None
-
-    for offset in range(1, 8):
-        day = DAYS[(today_idx + offset) % 7]
-        for s in all_schedules:
-            if s.day_of_week == day:
-                if s.service_type.value == "clinic" and not next_clinic:
-                    next_clinic = f"{day} – {s.start_time}"
-                if s.service_type.value == "theatre" and not next_theatre:
-                    next_theatre = f"{day} – {s.start_time}"
-        if next_clinic and next_theatre:
-            break
-
-    return {
+    return jsonable_encoder({
         "today": today,
-        "today_schedule": [UnitScheduleOut.model_validate(s) for s in schedules],
+        "today_schedule": _schedules_adapter.validate_python(schedules, from_attributes=True),
         "contextual_message": message,
         "next_clinic": next_clinic,
         "next_theatre": next_theatre,
-    }
+    })
+
+
+@router.get("/today")
+def get_today_schedule(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Get today's schedule with contextual information.
+
+    The payload is the same for every user until the day turns or the
+    schedule is edited, so it is cached per process and tagged with an
+    ETag derived from its content; unchanged polls get a bodiless 304.
+    """
+    key, today_idx = get_today()
+    with _today_cache_lock:
+        cached = _today_cache.get(key)
+    if cached is None:
+        # Encoded once per cache fill; hits send the stored bytes as-is
+        body = json.dumps(
+            _build_today_schedule(db, today_idx),
+            ensure_ascii=False, separators=(",", ":"), sort_keys=True,
+        ).encode()
+        cached = (body, f'"schedule-{hashlib.sha1(body).hexdigest()[:16]}"')
+        with _today_cache_lock:
+            _today_cache[key] = cached
+
+    body, etag = cached
+    headers = {"Cache-Control": "private, no-cache", "ETag": etag}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _invalidate_today_cache() -> None:
+    with _today_cache_lock:
+        _today_cache.clear()
 
 
 @router.post("/", response_model=UnitScheduleOut, status_code=201)
-async def create_schedule(
+def create_schedule(
     schedule_data: UnitScheduleCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_roles(UserRole.ADMIN, UserRole.CONSULTANT)),
@@ -104,12 +162,13 @@ async def create_schedule(
     schedule = UnitSchedule(**schedule_data.model_dump())
     db.add(schedule)
     db.commit()
+    _invalidate_today_cache()
     db.refresh(schedule)
     return UnitScheduleOut.model_validate(schedule)
 
 
 @router.put("/{schedule_id}", response_model=UnitScheduleOut)
-async def update_schedule(
+def update_schedule(
     schedule_id: int,
     schedule_data: UnitScheduleCreate,
     db: Session = Depends(get_db),
@@ -123,12 +182,13 @@ async def update_schedule(
     for field, value in schedule_data.model_dump().items():
         setattr(schedule, field, value)
     db.commit()
+    _invalidate_today_cache()
     db.refresh(schedule)
     return UnitScheduleOut.model_validate(schedule)
 
 
 @router.delete("/{schedule_id}")
-async def delete_schedule(
+def delete_schedule(
     schedule_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_roles(UserRole.ADMIN, UserRole.CONSULTANT)),
@@ -139,4 +199,5 @@ async def delete_schedule(
         raise HTTPException(status_code=404, detail="Schedule not found")
     schedule.is_active = False
     db.commit()
+    _invalidate_today_cache()
     return {"status": "ok"}
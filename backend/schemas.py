@@ -3,9 +3,9 @@ PS Consult – UNTH: Pydantic Schemas for Request/Response Validation
 """
 
 from datetime import datetime, date
-from typing import Optional
+from typing import Literal, Optional
 from pydantic import BaseModel, Field, field_validator
-from models import (
+from backend.models import (
     UserRole, UrgencyLevel, ConsultStatus, Designation,
     WoundClassification, WoundPhase, ServiceType, SyncStatus
 )
@@ -59,6 +59,11 @@ class UserOut(BaseModel):
         from_attributes = True
 
 
+class UserListResponse(BaseModel):
+    users: list[UserOut]
+    next_after_id: Optional[int] = None  # pass as after_id for the next page
+
+
 class UserUpdate(BaseModel):
     full_name: Optional[str] = None
     unit: Optional[str] = None
@@ -77,7 +82,7 @@ class ConsultRequestCreate(BaseModel):
     patient_name: str = Field(..., min_length=2, max_length=255)
     hospital_number: str = Field(..., min_length=1, max_length=50)
     age: int = Field(..., ge=0, le=150)
-    sex: str = Field(..., pattern=r"^(Male|Female)$")
+    sex: Literal["Male", "Female"]
     ward: str = Field(..., min_length=1, max_length=100)
     bed_number: str = Field(..., min_length=1, max_length=20)
     date_of_admission: date
@@ -143,9 +148,9 @@ class ConsultStatusUpdate(BaseModel):
 
 
 class ConsultListResponse(BaseModel):
-    total: int
-    page: int
+    total: Optional[int] = None  # only with include_total=true
     per_page: int
+    next_cursor: Optional[str] = None
     consults: list[ConsultRequestOut]
 
 
@@ -194,13 +199,24 @@ class ConsultReviewOut(BaseModel):
         from_attributes = True
 
 
+class PhotoOut(BaseModel):
+    """Photo metadata; the image itself is served from ``url``."""
+    id: int
+    filename: str
+    description: Optional[str] = None
+    url: str
+    uploaded_at: datetime
+
+
 # ──────────────────────────────────────────────────────────────────
 # Schedule Schemas
 # ──────────────────────────────────────────────────────────────────
 
 class UnitScheduleCreate(BaseModel):
     service_type: ServiceType
-    day_of_week: str = Field(..., pattern=r"^(Monday|Tuesday|Wednesday|Thursday|Friday|Saturday|Sunday)$")
+    day_of_week: Literal[
+        "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"
+    ]
     start_time: str = Field(default="08:00")
     end_time: str = Field(default="12:00")
     location: Optional[str] = None
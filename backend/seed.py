@@ -7,9 +7,13 @@ Seeds initial data:
 - Unit schedule (UNTH Plastic Surgery)
 """
 
-from database import SessionLocal, engine, Base
-from models import User, UnitSchedule, UserRole, ServiceType
-from auth import get_password_hash
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import insert
+
+from backend.database import SessionLocal, engine, Base
+from backend.models import User, UnitSchedule, UserRole, ServiceType
+from backend.auth import get_password_hash
 
 
 def seed():
@@ -20,71 +24,71 @@ def seed():
         # ── Users ─────────────────────────────────────────────────
         if db.query(User).count() == 0:
             users = [
-                User(
+                dict(
                     username="admin",
-                    hashed_password=get_password_hash("admin123"),
+                    password="admin123",
                     full_name="System Administrator",
                     role=UserRole.ADMIN,
                     unit="Administration",
                     is_active=True,
                 ),
-                User(
+                dict(
                     username="ps_registrar",
-                    hashed_password=get_password_hash("registrar123"),
+                    password="registrar123",
                     full_name="Dr. Chukwudi Okafor",
                     role=UserRole.REGISTRAR,
                     unit="Plastic Surgery",
                     phone_number="08012345678",
                     is_active=True,
                 ),
-                User(
+                dict(
                     username="ps_senior_reg",
-                    hashed_password=get_password_hash("senreg123"),
+                    password="senreg123",
                     full_name="Dr. Ngozi Eze",
                     role=UserRole.SENIOR_REGISTRAR,
                     unit="Plastic Surgery",
                     phone_number="08023456789",
                     is_active=True,
                 ),
-                User(
+                dict(
                     username="ps_consultant",
-                    hashed_password=get_password_hash("consultant123"),
+                    password="consultant123",
                     full_name="Dr. Okwesili",
                     role=UserRole.CONSULTANT,
                     unit="Plastic Surgery",
                     phone_number="08034567890",
                     is_active=True,
                 ),
-                User(
+                dict(
                     username="ortho_unit",
-                    hashed_password=get_password_hash("ortho123"),
+                    password="ortho123",
                     full_name="Orthopaedic Unit",
                     role=UserRole.INVITING_UNIT,
                     unit="Orthopaedic Surgery",
                     phone_number="08045678901",
                     is_active=True,
                 ),
-                User(
+                dict(
                     username="gen_surgery",
-                    hashed_password=get_password_hash("gensurg123"),
+                    password="gensurg123",
                     full_name="General Surgery Unit",
                     role=UserRole.INVITING_UNIT,
                     unit="General Surgery",
                     phone_number="08056789012",
                     is_active=True,
                 ),
-                User(
+                dict(
                     username="paediatrics",
-                    hashed_password=get_password_hash("paeds123"),
+                    password="paeds123",
                     full_name="Paediatrics Unit",
                     role=UserRole.INVITING_UNIT,
                     unit="Paediatrics",
                     phone_number="08067890123",
                     is_active=True,
                 ),
-                User(
+                dict(
                     username="emergency",
-                    hashed_password=get_password_hash("emergency123"),
+                    password="emergency123",
                     full_name="Emergency Unit",
                     role=UserRole.INVITING_UNIT,
                     unit="Accident & Emergency",
@@ -92,7 +96,15 @@ def seed():
                     is_active=True,
                 ),
             ]
-            db.add_all(users)
+            # Hash all passwords at once: argon2 releases the GIL, so the
+            # threads run on separate cores
+            with ThreadPoolExecutor() as pool:
+                hashes = pool.map(get_password_hash, [u.pop("password") for u in users])
+                for user, hashed in zip(users, hashes):
+                    user["hashed_password"] = hashed
+
+            # Plain rows through one executemany INSERT; no ORM unit of work
+            db.execute(insert(User), users)
             db.commit()
             print(f"✅ Seeded {len(users)} users")
         else:
@@ -102,7 +114,7 @@ def seed():
         if db.query(UnitSchedule).count() == 0:
             schedules = [
                 # Clinic Days
-                UnitSchedule(
+                dict(
                     service_type=ServiceType.CLINIC,
                     day_of_week="Tuesday",
                     start_time="09:00",
@@ -111,7 +123,7 @@ def seed():
                     notes="Drs Okwesili & Nnadi",
                     is_active=True,
                 ),
-                UnitSchedule(
+                dict(
                     service_type=ServiceType.CLINIC,
                     day_of_week="Wednesday",
                     start_time="09:00",
@@ -121,7 +133,7 @@ def seed():
                     is_active=True,
                 ),
                 # Theatre Days
-                UnitSchedule(
+                dict(
                     service_type=ServiceType.THEATRE,
                     day_of_week="Wednesday",
                     start_time="08:00",
@@ -130,7 +142,7 @@ def seed():
                     notes="Drs Okwesili & Nnadi",
                     is_active=True,
                 ),
-                UnitSchedule(
+                dict(
                     service_type=ServiceType.THEATRE,
                     day_of_week="Thursday",
                     start_time="08:00",
@@ -140,7 +152,7 @@ def seed():
                     is_active=True,
                 ),
                 # Ward Rounds
-                UnitSchedule(
+                dict(
                     service_type=ServiceType.WARD_ROUND,
                     day_of_week="Monday",
                     start_time="08:00",
@@ -149,7 +161,7 @@ def seed():
                     notes="Consultants' Ward Round",
                     is_active=True,
                 ),
-                UnitSchedule(
+                dict(
                     service_type=ServiceType.WARD_ROUND,
                     day_of_week="Friday",
                     start_time="08:00",
@@ -159,7 +171,7 @@ def seed():
                     is_active=True,
                 ),
             ]
-            db.add_all(schedules)
+            db.execute(insert(UnitSchedule), schedules)
             db.commit()
             print(f"✅ Seeded {len(schedules)} schedule entries")
         else:
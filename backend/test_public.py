@@ -1,9 +1,15 @@
-"""Quick test for public consult endpoint using TestClient."""
+"""Quick test for public consult endpoint using TestClient.
+
+Also sends a batch through the bulk sync endpoint, which creates all the
+consults in one transaction. Needs the seeded admin account.
+
+Run from the repository root: python -m backend.test_public
+"""
 import json
 
 # Test via FastAPI TestClient (no server needed)
 from fastapi.testclient import TestClient
-from main import app
+from backend.main import app
 
 client = TestClient(app)
 
@@ -29,3 +35,13 @@ resp = client.post("/api/consults/public", json=body)
 print(f"Status: {resp.status_code}")
 print(f"Body: {json.dumps(resp.json(), indent=2)}")
 
+# Batched path: one request, one commit for the whole list
+login = client.post("/api/auth/login", json={"username": "admin", "password": "admin123"})
+if login.status_code == 200:
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    batch = [{**body, "client_id": f"test-public-{i}"} for i in range(10)]
+    resp = client.post("/api/consults/sync", json=batch, headers=headers)
+    print(f"Batch status: {resp.status_code}")
+    print(f"Batch IDs: {[c['consult_id'] for c in resp.json()]}")
+else:
+    print("Skipping batch test: seed the database first (python -m backend.seed)")
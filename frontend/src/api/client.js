@@ -43,7 +43,7 @@ export const authAPI = {
   codeLogin: (code) => api.post('/auth/code-login', { code }),
   me: () => api.get('/auth/me'),
   register: (data) => api.post('/auth/register', data),
-  listUsers: () => api.get('/auth/users'),
+  listUsers: (params) => api.get('/auth/users', { params }),
   updateUser: (id, data) => api.put(`/auth/users/${id}`, data),
 };
 
@@ -69,6 +69,7 @@ export default function AdminPage() {
 /* ============ Users Tab ============ */
 function UsersTab() {
   const [users, setUsers] = useState([]);
+  const [nextAfterId, setNextAfterId] = useState(null);
   const [loading, setLoading] = useState(true);
   const [showForm, setShowForm] = useState(false);
   const [editing, setEditing] = useState(null);
@@ -77,7 +78,8 @@ function UsersTab() {
   const load = useCallback(async () => {
     try {
       const res = await authAPI.listUsers();
-      setUsers(res.data);
+      setUsers(res.data.users);
+      setNextAfterId(res.data.next_after_id);
     } catch {
       toast.error('Failed to load users');
     } finally {
@@ -85,6 +87,16 @@ function UsersTab() {
     }
   }, []);
 
+  const loadMore = async () => {
+    try {
+      const res = await authAPI.listUsers({ after_id: nextAfterId });
+      setUsers((prev) => [...prev, ...res.data.users]);
+      setNextAfterId(res.data.next_after_id);
+    } catch {
+      toast.error('Failed to load users');
+    }
+  };
+
   useEffect(() => { load(); }, [load]);
 
   const filtered = users.filter(
@@ -158,6 +170,14 @@ function UsersTab() {
           ))}
         </div>
       )}
+
+      {nextAfterId && (
+        <div className="flex justify-center mt-4">
+          <button onClick={loadMore} className="btn-secondary text-sm">
+            Load more
+          </button>
+        </div>
+      )}
     </div>
   );
 }
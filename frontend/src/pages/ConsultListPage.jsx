@@ -30,6 +30,8 @@ export default function ConsultListPage() {
   const [total, setTotal] = useState(0);
   const [loading, setLoading] = useState(true);
   const [page, setPage] = useState(1);
+  // cursors[i] fetches page i + 1; page 1 needs none
+  const [cursors, setCursors] = useState([null]);
   const [showFilters, setShowFilters] = useState(false);
 
   // Filters
@@ -43,8 +45,8 @@ export default function ConsultListPage() {
     try {
       if (isOnline) {
         const params = {
-          page,
           per_page: 20,
+          ...(cursors[page - 1] ? { cursor: cursors[page - 1] } : { include_total: true }),
           ...(search && { search }),
           ...(statusFilter && { status: statusFilter }),
           ...(urgencyFilter && { urgency: urgencyFilter }),
@@ -52,7 +54,8 @@ export default function ConsultListPage() {
         };
         const res = await consultsAPI.list(params);
         setConsults(res.data.consults);
-        setTotal(res.data.total);
+        if (res.data.total != null) setTotal(res.data.total);
+        setCursors((prev) => [...prev.slice(0, page), res.data.next_cursor]);
         // Cache for offline
         cacheConsults(res.data.consults);
       } else {
@@ -68,7 +71,7 @@ export default function ConsultListPage() {
     } finally {
       setLoading(false);
     }
-  }, [isOnline, page, search, statusFilter, urgencyFilter, wardFilter]);
+  }, [isOnline, page, search, statusFilter, urgencyFilter, wardFilter]); // eslint-disable-line
 
   useEffect(() => {
     fetchConsults();
@@ -321,8 +324,8 @@ export default function ConsultListPage() {
                 Page {page} of {totalPages}
               </span>
               <button
-                onClick={() => setPage(Math.min(totalPages, page + 1))}
-                disabled={page === totalPages}
+                onClick={() => setPage(page + 1)}
+                disabled={!cursors[page]}
                 className="btn-secondary text-sm"
               >
                 Next